@@ -8,18 +8,38 @@ Date: Feb 22nd 2025
 import streamlit as st
 import time
 import os
+import json
+import uuid
 from typing import Dict, Any
 from dotenv import load_dotenv, set_key
 from dataclasses import dataclass
-from relearnweb_backend import graph, ResearchAgentState
+from utils.llm import reset_llm_clients
+from utils.cache import make_key
+from utils.checkpoints import delete_checkpoint
+from utils.tracing import Trace
+from utils.jobs import JobLimitError, JobManager, ResearchJob
+from utils.model_profiles import DEFAULT_NODE_PROFILES, PROFILE_ENV_PREFIXES, ROUTED_NODES, node_profile_env
 
 # Constants
 ENV_KEYS = {
     "LLM_ENDPOINT": "",
     "LLM_API_KEY": "",
     "LLM_MODEL_ID": "",
+    "LLM_MAX_TOKENS": "",
+    "LLM_TEMPERATURE": "",
+    "FAST_LLM_ENDPOINT": "",
+    "FAST_LLM_API_KEY": "",
+    "FAST_LLM_MODEL_ID": "",
+    "FAST_LLM_MAX_TOKENS": "",
+    "FAST_LLM_TEMPERATURE": "",
     "FIRECRAWL_API_KEY": ""
 }
+# Seconds between progress polls of a running research job.
+POLL_INTERVAL = 0.5
+# Result tabs and the state field each one shows.
+RESULT_TABS = {"Queries": "queries", "Next Direction": "directions", "Learnings": "learnings", "Report": "report"}
+# Which model profile each graph node calls.
+NODE_PROFILE_KEYS = {node_profile_env(node): DEFAULT_NODE_PROFILES.get(node, "default") for node in ROUTED_NODES}
 
 # Set Page Config
 st.set_page_config(
@@ -86,11 +106,30 @@ def init_session_state():
     """Initialize session state variables."""
     if 'state' not in st.session_state:
         st.session_state.state = AppState()
+    if 'job_session_id' not in st.session_state:
+        st.session_state.job_session_id = uuid.uuid4().hex
+    # After a browser refresh, reattach to the research named in the URL.
+    run_id = st.query_params.get("run")
+    if run_id and 'job_id' not in st.session_state:
+        job = get_job_manager().find(run_id)
+        if job is not None:
+            st.session_state.job_id = job.job_id
+            st.session_state.state.research_in_progress = job.active
+            st.session_state.state.research_completed = job.status == "completed"
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """One background job manager per server process, shared by every session."""
+    return JobManager()
+
+def get_run_id(params: Dict[str, Any]) -> str:
+    """Stable run id for these parameters, so a stopped, refreshed or crashed research resumes from its checkpoint."""
+    return make_key(params['query'], params['depth'], params['breadth'], params['stop_mode'])[:16]
 
 def load_settings() -> Dict[str, str]:
     """Load settings from .env file."""
     load_dotenv()
-    return {key: os.getenv(key, default) for key, default in ENV_KEYS.items()}
+    return {key: os.getenv(key, default) for key, default in {**ENV_KEYS, **NODE_PROFILE_KEYS}.items()}
 
 def save_settings(settings: Dict[str, str]):
     """Save settings to .env file."""
@@ -98,6 +137,9 @@ def save_settings(settings: Dict[str, str]):
     env_path = os.path.join(os.getcwd(), '.env')
     for key, value in settings.items():
         set_key(env_path, key, value)
+        os.environ[key] = value
+    # Pooled LLM clients were built from the old settings.
+    reset_llm_clients()
 
 def render_header():
     """Render application header."""
@@ -112,7 +154,8 @@ def render_sidebar() -> Dict[str, Any]:
     params = {
         "query": st.sidebar.text_input("Research Query", "Quantum Computing breakthroughs"),
         "depth": st.sidebar.number_input("Depth", value=1, min_value=0, max_value=10),
-        "breadth": st.sidebar.number_input("Breadth", value=3, min_value=1, max_value=10)
+        "breadth": st.sidebar.number_input("Breadth", value=3, min_value=1, max_value=10),
+        "stop_mode": "adaptive" if st.sidebar.checkbox("Adaptive depth", value=False, help="Stop iterating once a round of research adds little new information.") else "fixed"
     }
     return params
 
@@ -127,6 +170,13 @@ def render_settings():
                 new_settings[key] = st.text_input(key.replace("_", " ").title(), value=current_settings.get(key, ""), type="password")
             else:
                 new_settings[key] = st.text_input(key.replace("_", " ").title(), value=current_settings.get(key, ""))
+        st.caption("Model per step. Fast settings left empty fall back to the default LLM settings.")
+        profiles = list(PROFILE_ENV_PREFIXES)
+        for key in NODE_PROFILE_KEYS:
+            current = current_settings.get(key) or NODE_PROFILE_KEYS[key]
+            new_settings[key] = st.selectbox(
+                key.replace("_LLM_PROFILE", "").replace("_", " ").title(), profiles,
+                index=profiles.index(current) if current in profiles else 0)
         col1, col2 = st.columns(2)
         save_clicked = col1.form_submit_button("Save Settings")
         cancel_clicked = col2.form_submit_button("Cancel")
@@ -139,51 +189,113 @@ def render_settings():
         elif cancel_clicked:
             st.session_state.state.show_settings = False
 
-def run_research(params: Dict[str, Any]):
-    """Execute research pipeline."""
+def render_trace_summary(trace: Trace):
+    """Show where the run's time went, per node and external call."""
+    summary = trace.summary()
+    if not summary["spans"]:
+        return
+    with st.expander(f"Performance ({summary['wall_ms'] / 1000:.1f}s)"):
+        st.table([{"span": name, **values} for name, values in summary["spans"].items()])
+        st.download_button(
+            label="Download Trace",
+            data=json.dumps(trace.to_chrome(), default=str),
+            file_name=f"{trace.run_id}.trace.json",
+            mime="application/json"
+        )
+
+def start_research(params: Dict[str, Any]) -> bool:
+    """Submit the research pipeline as a background job."""
+    # The backend (LangGraph and the graph itself) loads on the first research, not on page load.
+    from relearnweb_backend import ResearchAgentState
     initial_state = ResearchAgentState(
+        run_id=get_run_id(params),
         depth=params["depth"],
         breadth=params["breadth"],
         query=params["query"],
+        queries=[],
         results="",
+        sources=[],
         directions="",
         learnings="",
-        report=""
+        report="",
+        stats={},
+        stop_mode=params["stop_mode"],
+        novelty=1.0
     )
-    
+    try:
+        job = get_job_manager().submit(st.session_state.job_session_id, initial_state, run_id=initial_state["run_id"])
+    except JobLimitError as error:
+        st.sidebar.error(str(error))
+        return False
+    st.session_state.job_id = job.job_id
+    st.query_params["run"] = job.run_id
+    return True
+
+def tab_content(job: ResearchJob, key: str) -> str:
+    if key == "queries":
+        # Every breadth query of the current iteration; the user's query until they exist.
+        queries = job.state.get("queries") or [job.state.get("query") or ""]
+        return "\n".join(f"- {query}" for query in queries if query)
+    content = job.state.get(key) or ""
+    # Until the report node finishes, show the report as it streams in.
+    if key == "report" and not content:
+        content = job.live_report
+    if content.startswith("```"):
+        content = content.strip("\n ```")
+    return content
+
+def render_research(job: ResearchJob, params: Dict[str, Any]):
+    """Render a research job, updating each tab in place until the job finishes."""
     total_steps = 7 + 6 * params["depth"]
     progress_bar = st.progress(0)
-    progress_text = st.empty()
-    tabs = st.tabs(["Queries", "Next Direction", "Learnings", "Report"])
-    
-    prev_state = {"query": "", "directions": "", "learnings": "", "report": ""}
-    
-    for event_counter, event in enumerate(graph.compile().stream(initial_state), 1):
-        if st.session_state.state.stop_requested:
-            st.warning("Research stopped by user.")
-            return
-            
-        progress = min(int(event_counter / total_steps * 100), 100)
-        progress_bar.progress(progress)
-        progress_text.text(f"Task {event_counter} of {total_steps} completed.")
-        
-        # Extract the first key's value from the event dictionary
-        event_key = next(iter(event))
-        event_data = event[event_key]
-        
-        for tab, key in zip(tabs, ["query", "directions", "learnings", "report"]):
-            if event_data.get(key, "") != prev_state.get(key, ""):
-                content = event_data.get(key, "")
-                if content.startswith("```"):
-                    content = content.strip("\n ```")
-                tab.markdown(f"**{key.title()}:**\n\n{content}")
-                prev_state[key] = content
+    status = st.empty()
+    tabs = st.tabs(list(RESULT_TABS))
+    placeholders = {key: tab.empty() for tab, key in zip(tabs, RESULT_TABS.values())}
+    rendered = {}
+
+    # Poll the background job, redrawing a tab only when its field has changed.
+    while True:
+        for key, placeholder in placeholders.items():
+            version = (job.versions.get(key, 0), job.versions.get("live_report", 0) if key == "report" else 0)
+            if rendered.get(key) == version:
+                continue
+            rendered[key] = version
+            content = tab_content(job, key)
+            if content:
+                placeholder.markdown(f"**{key.title()}:**\n\n{content}")
+        progress_bar.progress(min(int(job.events / total_steps * 100), 100))
+        if job.status == "queued":
+            status.text("Waiting for a free research slot...")
+        else:
+            status.text(f"Task {job.events} of {total_steps} completed.")
+        if not job.active:
+            break
+        time.sleep(POLL_INTERVAL)
+
+    if st.session_state.state.research_in_progress:
+        # The job finished while this script run was polling it; rerun so the sidebar catches up.
+        st.rerun()
+    if job.status == "cancelled":
+        st.warning("Research stopped by user.")
+        return
+    if job.status == "failed":
+        st.error(f"Research failed: {job.error}")
+        return
+
+    stats = job.state.get("stats") or {}
     
     # After research completes, store the final report for export.
-    st.session_state["research_report"] = prev_state["report"]
+    st.session_state["research_report"] = job.state.get("report", "")
     st.session_state.state.research_completed = True
     
     st.success("Research completed successfully! You can now export your research report.")
+    if stats.get("pages_skipped"):
+        st.caption(f"Skipped {stats['pages_skipped']} already-seen pages ({stats['bytes_saved'] / 1024:.0f} KB not re-summarized).")
+    if stats.get("crawl_queries_failed"):
+        st.caption(f"{stats['crawl_queries_failed']} search quer{'y' if stats['crawl_queries_failed'] == 1 else 'ies'} failed and were skipped.")
+    if stats.get("stopped_early"):
+        st.caption(f"Adaptive depth stopped {stats['iterations_skipped']} iteration(s) early, saving ~{stats['llm_calls_saved']} LLM and {stats['crawl_calls_saved']} crawl calls.")
+    render_trace_summary(job.trace)
     
     # Provide a download button for the research report in the main interface.
     st.download_button(
@@ -212,11 +324,12 @@ def main():
     if st.session_state.state.research_in_progress:
         if st.sidebar.button("🛑 Stop Research"):
             st.session_state.state.stop_requested = True
-            st.session_state.state.research_in_progress = False
+            get_job_manager().cancel(st.session_state.get("job_id"))
     else:
         if not st.session_state.state.research_completed:
-            if st.sidebar.button("🚀 Start Research"):
+            if st.sidebar.button("🚀 Start Research") and start_research(params):
                 st.session_state.state.research_in_progress = True
+                st.session_state.state.stop_requested = False
         if st.sidebar.button("⚙️ AI Settings"):
             st.session_state.state.show_settings = True
 
@@ -227,17 +340,28 @@ def main():
             st.session_state.state.research_completed = False
             if "research_report" in st.session_state:
                 pass
+            # Start the next research from scratch instead of reloading this checkpoint.
+            job = get_job_manager().get(st.session_state.pop("job_id", None))
+            if job is not None and not get_job_manager().find(job.run_id).active:
+                delete_checkpoint(job.run_id)
+            st.query_params.pop("run", None)
             st.rerun()
     
     # Render settings if requested.
     if st.session_state.state.show_settings and not st.session_state.state.research_in_progress:
         render_settings()
     
-    # Run research if initiated.
+    # Show the background research job while it runs, and its results once done.
+    job = get_job_manager().get(st.session_state.get("job_id"))
     if st.session_state.state.research_in_progress:
-        run_research(params)
-        st.session_state.state.research_completed = True
-        st.session_state.state.research_in_progress = False
+        if job is None:
+            st.session_state.state.research_in_progress = False
+            st.rerun()
+        if not job.active:
+            st.session_state.state.research_in_progress = False
+            st.session_state.state.research_completed = job.status == "completed"
+    if job is not None:
+        render_research(job, params)
 
 if __name__ == "__main__":
     main()
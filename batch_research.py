@@ -0,0 +1,151 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the headless batch runner for bulk research jobs.
+
+Usage:
+    python batch_research.py jobs.jsonl results.jsonl --concurrency 4 --llm-rps 2 --crawl-rps 1 --timeout 900
+
+Each input line is a JSON object: {"query": "...", "depth": 1, "breadth": 3}
+with an optional "id" and "stop_mode" ("fixed" or "adaptive"). Results are appended to the output file as soon as
+each job finishes; jobs already recorded there as "ok" are skipped on a re-run.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from relearnweb_backend import astream_research, ResearchAgentState
+from utils.tracing import Trace
+from utils.cache import make_key
+from utils.ratelimit import set_rate_limit
+from utils.resilience import DeadlineExceeded
+
+def load_jobs(path: str) -> list:
+    jobs, ids = [], set()
+    with open(path, encoding="utf-8") as jobs_file:
+        for line_number, line in enumerate(jobs_file, 1):
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            if not job.get("query"):
+                raise ValueError(f"{path}:{line_number}: job has no 'query'")
+            job.setdefault("depth", 1)
+            job.setdefault("breadth", 3)
+            job.setdefault("stop_mode", "fixed")
+            if "id" in job:
+                if job["id"] in ids:
+                    raise ValueError(f"{path}:{line_number}: duplicate job id {job['id']!r}")
+            else:
+                # A stable id lets a re-run batch resume or reload jobs from their checkpoints.
+                # Identical lines get the line number added, so they never share a checkpoint.
+                job["id"] = make_key(job["query"], job["depth"], job["breadth"], job["stop_mode"])[:16]
+                if job["id"] in ids:
+                    job["id"] = f"{job['id']}-{line_number}"
+            ids.add(job["id"])
+            jobs.append(job)
+    return jobs
+
+def load_finished_ids(path: str) -> set:
+    """Ids of jobs an earlier run of this batch already completed."""
+    if not os.path.exists(path):
+        return set()
+    finished = set()
+    with open(path, encoding="utf-8") as results_file:
+        for line in results_file:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if result.get("status") == "ok":
+                finished.add(result.get("id"))
+    return finished
+
+async def run_job(job: dict, semaphore: asyncio.Semaphore, timeout: float) -> dict:
+    initial_state = ResearchAgentState(
+        run_id=job["id"],
+        depth=job["depth"],
+        breadth=job["breadth"],
+        query=job["query"],
+        queries=[],
+        results="",
+        sources=[],
+        directions="",
+        learnings="",
+        report="",
+        stats={},
+        stop_mode=job["stop_mode"],
+        novelty=1.0
+    )
+    result = {"id": job["id"], "query": job["query"], "depth": job["depth"], "breadth": job["breadth"]}
+    final_state = {}
+    trace = Trace(job["id"])
+
+    async def consume():
+        async for event in astream_research(initial_state, run_id=job["id"], trace=trace, timeout=timeout):
+            final_state.update(next(iter(event.values())) or {})
+            result["events"] = result.get("events", 0) + 1
+
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(consume(), timeout=timeout)
+            result["status"] = "ok"
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            # Either the run deadline or wait_for may fire first; both are timeouts.
+            result["status"] = "timeout"
+        except Exception as error:
+            result["status"] = "error"
+            result["error"] = f"{type(error).__name__}: {error}"
+        result["elapsed_s"] = round(time.perf_counter() - started, 3)
+
+    result["stats"] = final_state.get("stats", {})
+    result["trace"] = trace.summary()
+    result["report"] = final_state.get("report", "")
+    return result
+
+async def run_batch(jobs: list, output_path: str, concurrency: int, timeout: float) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [asyncio.create_task(run_job(job, semaphore, timeout)) for job in jobs]
+    summary = {"ok": 0, "timeout": 0, "error": 0}
+    started = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as output:
+        # Write each job as soon as it finishes instead of waiting on the slowest one.
+        for finished in asyncio.as_completed(tasks):
+            result = await finished
+            summary[result["status"]] += 1
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+            print(f"[{sum(summary.values())}/{len(jobs)}] {result['status']:7} {result['elapsed_s']:8.1f}s  {result['query']}")
+    summary["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Run research jobs from a JSONL file without the Streamlit UI.")
+    parser.add_argument("jobs", help="input JSONL with {query, depth, breadth} per line")
+    parser.add_argument("output", help="output JSONL; one result line is appended per finished job")
+    parser.add_argument("--concurrency", type=int, default=4, help="research jobs running at once")
+    parser.add_argument("--llm-rps", type=float, default=None, help="global LLM requests per second")
+    parser.add_argument("--crawl-rps", type=float, default=None, help="global Firecrawl requests per second")
+    parser.add_argument("--timeout", type=float, default=900, help="per-job timeout in seconds")
+    args = parser.parse_args()
+
+    if args.llm_rps:
+        set_rate_limit("llm", args.llm_rps)
+    if args.crawl_rps:
+        set_rate_limit("firecrawl", args.crawl_rps)
+
+    jobs = load_jobs(args.jobs)
+    finished = load_finished_ids(args.output)
+    if finished:
+        print(f"Skipping {sum(job['id'] in finished for job in jobs)} job(s) already completed in {args.output}")
+        jobs = [job for job in jobs if job["id"] not in finished]
+    summary = asyncio.run(run_batch(jobs, args.output, max(1, args.concurrency), args.timeout))
+    print(json.dumps(summary))
+
+if __name__ == "__main__":
+    main()
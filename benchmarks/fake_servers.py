@@ -0,0 +1,154 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains local stand-ins for an OpenAI-compatible LLM endpoint and
+the Firecrawl search/scrape API, with configurable latency, payload size and
+error rate, so benchmarks run reproducibly without network access.
+"""
+
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import hashlib
+import json
+import random
+import threading
+import time
+
+WORDS = ("quantum error correction logical qubit superconducting photonic trapped ion annealing "
+         "algorithm benchmark fidelity coherence topological surface code decoder hardware roadmap "
+         "investment startup research laboratory milestone simulation chemistry cryptography").split()
+
+@dataclass
+class FakeBackendConfig:
+    latency_s: float = 0.2          # mean response latency
+    jitter_s: float = 0.05          # uniform +/- jitter around the mean
+    payload_words: int = 300        # words per LLM completion / per scraped page
+    error_rate: float = 0.0         # fraction of requests answered with HTTP 500
+    stream_chunk_words: int = 8     # words per SSE chunk for streamed completions
+    seed: int = 0
+
+def fake_text(seed_text: str, words: int) -> str:
+    rng = random.Random(hashlib.sha256(seed_text.encode("utf-8")).digest())
+    sentences, sentence = [], []
+    for _ in range(words):
+        sentence.append(rng.choice(WORDS))
+        if len(sentence) >= rng.randint(8, 16):
+            sentences.append(" ".join(sentence).capitalize() + ".")
+            sentence = []
+    if sentence:
+        sentences.append(" ".join(sentence).capitalize() + ".")
+    # Paragraph breaks every few sentences so chunking has something to split.
+    return "\n\n".join(" ".join(sentences[i:i + 4]) for i in range(0, len(sentences), 4))
+
+class FakeHandler(BaseHTTPRequestHandler):
+    config: FakeBackendConfig = FakeBackendConfig()
+    rng = random.Random(0)
+    rng_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def delay_and_maybe_fail(self) -> bool:
+        with self.rng_lock:
+            jitter = self.rng.uniform(-self.config.jitter_s, self.config.jitter_s)
+            failed = self.rng.random() < self.config.error_rate
+        time.sleep(max(0.0, self.config.latency_s + jitter))
+        if failed:
+            self.send_json({"error": {"message": "injected failure", "type": "server_error"}}, status=500)
+        return failed
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request = self.read_json()
+        if self.delay_and_maybe_fail():
+            return
+        path = self.path.rstrip("/")
+        if path.endswith("/chat/completions"):
+            self.chat_completion(request)
+        elif path.endswith("/search"):
+            self.search(request)
+        elif path.endswith("/scrape"):
+            self.scrape(request)
+        else:
+            self.send_json({"error": f"unknown path {self.path}"}, status=404)
+
+    def chat_completion(self, request: dict):
+        prompt = "\n".join(str(message.get("content", "")) for message in request.get("messages", []))
+        # Always include query tags so serp_queries can parse up to `breadth` queries.
+        seed = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        queries = "".join(f"<query>benchmark topic {seed} {i}</query>" for i in range(10))
+        content = f"{queries}\n\n{fake_text(prompt, self.config.payload_words)}"
+        model = request.get("model", "fake-model")
+        created = int(time.time())
+        usage = {"prompt_tokens": len(prompt.split()), "completion_tokens": len(content.split()),
+                 "total_tokens": len(prompt.split()) + len(content.split())}
+
+        if not request.get("stream"):
+            self.send_json({
+                "id": f"chatcmpl-{seed}", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        words = content.split(" ")
+        step = max(1, self.config.stream_chunk_words)
+        for i in range(0, len(words), step):
+            piece = " ".join(words[i:i + step]) + (" " if i + step < len(words) else "")
+            self.write_event({"id": f"chatcmpl-{seed}", "object": "chat.completion.chunk", "created": created,
+                              "model": model, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]})
+        self.write_event({"id": f"chatcmpl-{seed}", "object": "chat.completion.chunk", "created": created,
+                          "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def write_event(self, payload: dict):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def page(self, url: str, title: str, with_markdown: bool) -> dict:
+        item = {"url": url, "title": title, "description": fake_text(f"{url}:description", 30)}
+        if with_markdown:
+            item["markdown"] = f"# {title}\n\n{fake_text(url, self.config.payload_words)}"
+        return item
+
+    def search(self, request: dict):
+        query = request.get("query", "")
+        limit = int(request.get("limit", 5))
+        with_markdown = "markdown" in (request.get("scrapeOptions") or {}).get("formats", [])
+        digest = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        data = [self.page(f"https://example.com/{digest[:6]}/{i}", f"{query} result {i}", with_markdown)
+                for i in range(limit)]
+        self.send_json({"success": True, "data": data})
+
+    def scrape(self, request: dict):
+        url = request.get("url", "")
+        page = self.page(url, f"Page {url.rsplit('/', 1)[-1]}", True)
+        self.send_json({"success": True, "data": {"markdown": page["markdown"],
+                                                  "metadata": {"title": page["title"], "sourceURL": url}}})
+
+def start_fake_server(config: FakeBackendConfig) -> ThreadingHTTPServer:
+    """Serve both fake APIs on an ephemeral localhost port in a daemon thread."""
+    handler = type("ConfiguredFakeHandler", (FakeHandler,), {"config": config, "rng": random.Random(config.seed)})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-backend", daemon=True).start()
+    return server
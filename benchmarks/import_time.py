@@ -0,0 +1,118 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the startup benchmark. Each module is imported in a fresh
+interpreter to measure cold import time and which heavy dependencies it pulls
+in, and the research graph's first and cached compile times are measured too.
+
+Usage:
+    python -m benchmarks.import_time --repeats 5
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from benchmarks.run_benchmarks import RESULTS_DIR, git_revision
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules the Streamlit app imports on page load, then the backend it loads on the first research.
+MODULES = ["utils.llm", "utils.firecrawler", "utils.jobs", "relearnweb_backend"]
+HEAVY_MODULES = ["langgraph", "langchain_openai", "langchain_core", "firecrawl", "httpx", "numpy"]
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+GRAPH_PROBE = """
+import json, time
+import relearnweb_backend as backend
+started = time.perf_counter()
+backend.get_compiled_graph()
+first = time.perf_counter() - started
+started = time.perf_counter()
+backend.get_compiled_graph()
+cached = time.perf_counter() - started
+print(json.dumps({"first_s": first, "cached_s": cached}))
+"""
+
+def probe(code: str) -> dict:
+    completed = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def measure_import(module: str, repeats: int) -> dict:
+    samples = [probe(IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)) for _ in range(repeats)]
+    errors = [sample["error"] for sample in samples if "error" in sample]
+    if errors:
+        return {"module": module, "error": errors[0]}
+    return {
+        "module": module,
+        "median_s": round(statistics.median(sample["seconds"] for sample in samples), 4),
+        "max_s": round(max(sample["seconds"] for sample in samples), 4),
+        "heavy_loaded": samples[0]["loaded"],
+    }
+
+def measure_graph(repeats: int) -> dict:
+    samples = [probe(GRAPH_PROBE) for _ in range(repeats)]
+    errors = [sample["error"] for sample in samples if "error" in sample]
+    if errors:
+        return {"error": errors[0]}
+    return {
+        "first_compile_s": round(statistics.median(sample["first_s"] for sample in samples), 4),
+        "cached_compile_s": round(statistics.median(sample["cached_s"] for sample in samples), 6),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import and graph compile times.")
+    parser.add_argument("--modules", default=",".join(MODULES), help="comma-separated modules to import")
+    parser.add_argument("--repeats", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    imports = []
+    for module in args.modules.split(","):
+        result = measure_import(module, args.repeats)
+        imports.append(result)
+        if "error" in result:
+            print(f"{module:20} error: {result['error']}")
+        else:
+            print(f"{module:20} median={result['median_s']:.3f}s  max={result['max_s']:.3f}s  "
+                  f"heavy={','.join(result['heavy_loaded']) or '-'}")
+    graph = measure_graph(args.repeats)
+    if "error" in graph:
+        print(f"{'graph compile':20} error: {graph['error']}")
+    else:
+        print(f"{'graph compile':20} first={graph['first_compile_s']:.3f}s  cached={graph['cached_compile_s']:.6f}s")
+
+    report = {
+        "meta": {
+            "git_revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "imports": imports,
+        "graph": graph,
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir, f"import-{time.strftime('%Y%m%d-%H%M%S')}-{report['meta']['git_revision']}.json")
+    with open(output_path, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2)
+    print(f"\nResults written to {output_path}")
+
+if __name__ == "__main__":
+    main()
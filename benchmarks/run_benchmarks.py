@@ -0,0 +1,185 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the end-to-end benchmark for the research graph. It runs
+the real `relearnweb_backend` graph against local fake LLM and Firecrawl
+endpoints over a depth/breadth grid and reports p50/p95 latency, throughput
+and peak memory.
+
+Usage:
+    python -m benchmarks.run_benchmarks --depths 0,1 --breadths 1,3 --repeats 5
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<previous>.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from benchmarks.fake_servers import FakeBackendConfig, start_fake_server
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def configure_environment(server_url: str, cache_dir: str, search_mode: str = "full"):
+    # Must run before relearnweb_backend is imported: caches and paths are read at import time.
+    os.environ.update({
+        "LLM_ENDPOINT": f"{server_url}/v1",
+        "LLM_API_KEY": "benchmark",
+        "LLM_MODEL_ID": "fake-model",
+        "FIRECRAWL_API_KEY": "fc-benchmark",
+        "FIRECRAWL_API_URL": server_url,
+        "FIRECRAWL_CACHE_DISABLED": "1",
+        "RELEARNWEB_CACHE_DIR": cache_dir,
+        "CHECKPOINT_PATH": os.path.join(cache_dir, "checkpoints.sqlite"),
+        "TRACE_DIR": os.path.join(cache_dir, "traces"),
+        "EMBEDDING_MODEL": "hashing",
+        "SEARCH_MODE": search_mode,
+    })
+
+async def run_once(backend, depth: int, breadth: int) -> float:
+    # A unique query per run keeps the LLM memo and checkpoints from short-circuiting work.
+    run_id = uuid.uuid4().hex
+    initial_state = backend.ResearchAgentState(
+        run_id=run_id, depth=depth, breadth=breadth, query=f"Quantum computing breakthroughs {run_id}",
+        queries=[], results="", sources=[], directions="", learnings="", report="", stats={}, stop_mode="fixed", novelty=1.0)
+    started = time.perf_counter()
+    async for _ in backend.astream_research(initial_state, run_id=run_id):
+        pass
+    return time.perf_counter() - started
+
+async def run_cell(backend, depth: int, breadth: int, repeats: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def guarded(latencies: list, errors: list):
+        async with semaphore:
+            try:
+                latencies.append(await run_once(backend, depth, breadth))
+            except Exception as error:
+                errors.append(f"{type(error).__name__}: {error}")
+
+    # One untimed run pays for lazy imports, tokenizer loading and client setup,
+    # so the timed runs measure steady-state node work.
+    await guarded([], [])
+
+    # Latency is measured without tracemalloc, whose hooks slow every allocation.
+    started = time.perf_counter()
+    await asyncio.gather(*(guarded(latencies, errors) for _ in range(repeats)))
+    wall = time.perf_counter() - started
+
+    # Peak memory comes from a separate round of `concurrency` runs under tracemalloc.
+    tracemalloc.start()
+    await asyncio.gather(*(guarded([], []) for _ in range(concurrency)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "depth": depth,
+        "breadth": breadth,
+        "runs": repeats,
+        "errors": len(errors),
+        "p50_s": round(percentile(latencies, 0.5), 4),
+        "p95_s": round(percentile(latencies, 0.95), 4),
+        "mean_s": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+        "throughput_runs_per_s": round(len(latencies) / wall, 4) if wall else 0.0,
+        "peak_memory_mb": round(peak / 2 ** 20, 2),
+        "sample_errors": errors[:3],
+    }
+
+def compare(current: dict, baseline_path: str, threshold: float) -> bool:
+    """Print per-cell deltas against a previous result file; return True if anything regressed."""
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = {(cell["depth"], cell["breadth"]): cell for cell in json.load(baseline_file)["results"]}
+    regressed = False
+    print(f"\nComparison against {baseline_path} (threshold {threshold:.0%}):")
+    for cell in current["results"]:
+        previous = baseline.get((cell["depth"], cell["breadth"]))
+        if previous is None:
+            continue
+        for metric in ("p50_s", "p95_s", "peak_memory_mb"):
+            before, after = previous[metric], cell[metric]
+            change = (after - before) / before if before else 0.0
+            flag = "REGRESSION" if change > threshold else ""
+            regressed = regressed or bool(flag)
+            print(f"  depth={cell['depth']} breadth={cell['breadth']} {metric:15} {before:>9} -> {after:>9} ({change:+.1%}) {flag}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the research graph against local fake backends.")
+    parser.add_argument("--depths", default="0,1,2", help="comma-separated depth values")
+    parser.add_argument("--breadths", default="1,3", help="comma-separated breadth values")
+    parser.add_argument("--repeats", type=int, default=5, help="runs per grid cell")
+    parser.add_argument("--concurrency", type=int, default=1, help="runs in flight per grid cell")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake backend mean latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="fake backend latency jitter in seconds")
+    parser.add_argument("--payload-words", type=int, default=300, help="words per completion / scraped page")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake requests that fail")
+    parser.add_argument("--search-mode", choices=["full", "two_phase"], default="full",
+                        help="scrape every search result, or rank snippets and scrape only the best")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--compare", help="previous result file to diff against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    config = FakeBackendConfig(latency_s=args.latency, jitter_s=args.jitter, payload_words=args.payload_words,
+                               error_rate=args.error_rate, seed=args.seed)
+    server = start_fake_server(config)
+    cache_dir = tempfile.mkdtemp(prefix="relearnweb-bench-")
+    configure_environment(f"http://127.0.0.1:{server.server_address[1]}", cache_dir, args.search_mode)
+
+    import relearnweb_backend as backend
+
+    results = []
+    for depth in (int(value) for value in args.depths.split(",")):
+        for breadth in (int(value) for value in args.breadths.split(",")):
+            cell = asyncio.run(run_cell(backend, depth, breadth, args.repeats, max(1, args.concurrency)))
+            results.append(cell)
+            print(f"depth={depth} breadth={breadth}  p50={cell['p50_s']:.3f}s  p95={cell['p95_s']:.3f}s  "
+                  f"throughput={cell['throughput_runs_per_s']:.3f}/s  peak={cell['peak_memory_mb']:.1f}MB  "
+                  f"errors={cell['errors']}")
+    server.shutdown()
+
+    report = {
+        "meta": {
+            "git_revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['meta']['git_revision']}.json")
+    with open(output_path, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2)
+    print(f"\nResults written to {output_path}")
+
+    if args.compare and compare(report, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -7,75 +7,264 @@ Date: Feb 21st 2025
 This file contains the implementation of the Firecrawl search functionality.
 """
 
-from typing import TypedDict
+from typing import TypedDict, List
+import asyncio
+import os
+import re
+import uuid
+import warnings
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from langgraph.graph import StateGraph, START, END
-from utils.llm import generate_llm_response
-from utils.firecrawler import crawl_firechain
+from langgraph.types import StreamWriter
+from utils.aio import iterate_sync
+from utils.checkpoints import CHECKPOINT_PATH, touch_checkpoint
+from utils.llm import agenerate_llm_response
+from utils.firecrawler import SEARCH_MODE, acrawl_firechain, astream_two_phase, extract_documents
+from utils.content_store import content_store
+from utils.chunking import build_context, count_tokens, pack_chunks, CONTEXT_TOKEN_BUDGET
+from utils.resilience import deadline
+from utils.run_context import get_run_context, release_run_context
+from utils.tracing import Trace, TRACE_ENABLED, count, span, start_trace, traced_node
 from datetime import datetime
 from prompts.system_prompt import systems as system_prompt
 
+# Upper bound on concurrent crawls, regardless of breadth.
+MAX_PARALLEL_QUERIES = int(os.getenv("MAX_PARALLEL_QUERIES", 5))
+# Upper bound on concurrent per-page summaries (map calls).
+MAX_PARALLEL_SUMMARIES = int(os.getenv("MAX_PARALLEL_SUMMARIES", 8))
+# Token budget for the context of a single page summary.
+PAGE_TOKEN_BUDGET = int(os.getenv("PAGE_TOKEN_BUDGET", 1500))
+# Optional deadline in seconds for a whole research run.
+RESEARCH_TIMEOUT = float(os.getenv("RESEARCH_TIMEOUT")) if os.getenv("RESEARCH_TIMEOUT") else None
+# In "adaptive" stop mode, iterations end once the share of new n-grams drops below this.
+NOVELTY_THRESHOLD = float(os.getenv("NOVELTY_THRESHOLD", 0.25))
+# How many earlier learnings learner_node pulls from the run's embedding index.
+LEARNINGS_TOP_K = 8
+
 # -------------------------------
 # Define the Research Agent State
 # -------------------------------
 
 # Define the custom state structure for the research agent.
 class ResearchAgentState(TypedDict):
+    run_id: str
     depth: int
     breadth: int
     query: str
+    queries: List[str]
     results: str
+    # Compact references into the content store; raw crawls and pages never enter the state.
+    sources: List[dict]
     directions: str
     learnings: str
     report: str
+    stats: dict
+    stop_mode: str
+    novelty: float
+
+# Nodes return only the keys they change, so stream events and checkpoints
+# carry deltas instead of the full state.
 
 # Node: Input Node (initializes or verifies state parameters)
-def input_node(state: ResearchAgentState) -> ResearchAgentState:
+def input_node(state: ResearchAgentState) -> dict:
     # You can modify or confirm state values here if needed.
-    return state
+    if not state.get("run_id"):
+        return {"run_id": uuid.uuid4().hex}
+    return {}
+
+# Split a bullet-point summary into individual learnings for the embedding index.
+def split_learnings(summary: str) -> list:
+    items = [line.strip(" \t-*") for line in summary.splitlines() if line.strip(" \t-*#")]
+    return [{"text": item} for item in items if len(item.split()) > 3]
+
+# Retrieve the earlier learnings most relevant to the current query and directions.
+def relevant_learnings(state: ResearchAgentState) -> str:
+    index = get_run_context(state["run_id"]).index
+    if not len(index):
+        return state["learnings"]
+    hits = index.search(f"{state['query']}\n{state['directions']}", k=LEARNINGS_TOP_K, kind="learning")
+    return "\n".join(f"- {item['text']}" for _, item in hits)
 
 # Node: Deep Research - perform initial research using the query.
-def learner_node(state: ResearchAgentState) -> ResearchAgentState:
+async def learner_node(state: ResearchAgentState) -> dict:
     # Current Date
     cdate = datetime.now().strftime("%Y-%m-%d")
+    previous_learnings = await asyncio.to_thread(relevant_learnings, state)
     prompt = "".join((
         f"You are a research assistant. We have a query: '{state['query']}'.\n",
         f"Depth: {state['depth']}, Breadth: {state['breadth']}.\n",
         "Generate an outline of subtopics or steps to research deeply.",
         "First talk about the goal of the research that this query is meant to accomplish, then go deeper into how to advance the research once the results are found, mention additional research directions. Be as specific as possible, especially for additional research directions.",
-        f"Previous Learnings and Directions:\n{state['learnings']}\n{state['directions']}"
+        f"Previous Learnings and Directions:\n{previous_learnings}\n{state['directions']}"
         f"Today's Date: {cdate}"
     ))
-    response = generate_llm_response(system_prompt=system_prompt, user_prompt = prompt, streaming=False)
+    response = await agenerate_llm_response(system_prompt=system_prompt, user_prompt = prompt, streaming=False, node="learner_node")
     outline = response
-    state["results"] = f"Initial Outline:\n{outline}"
-    return state
+    return {"results": f"Initial Outline:\n{outline}"}
 
 # Node: SERP Queries - simulate search engine queries.
-def serp_queries(state: ResearchAgentState) -> ResearchAgentState:
-    numqueries = 1
-    res_format = "You have to return in XML format example : <query>Quantum Computing breakthroughs</query>"
-    prompt = f"User Prompt : {state['results']}\n---------\nGiven the following prompt from the user, generate a list of SERP queries to research the topic. Return a maximum of ${numqueries} queries, but feel free to return less if the original prompt is clear.\n{res_format}\nMake sure each query is unique and not similar to each other:"
-    res = generate_llm_response(system_prompt=system_prompt,user_prompt=prompt)
-    state["query"] = res.split("<query>")[1].split("</query>")[0]
-    return state
-
-# Node: Process Results - summarize the collected research.
-def process_results(state: ResearchAgentState) -> ResearchAgentState:
-    search_results = crawl_firechain(state["query"])
-    state["results"] = search_results
-    prompt = "".join(("Summarize the following research findings in bullet points. ", "Highlight key learnings and potential directions.\n\n", f"{state['results']}"))
-    summary = generate_llm_response(system_prompt=system_prompt, user_prompt=prompt)
-    state["learnings"] = summary
-    return state
+async def serp_queries(state: ResearchAgentState) -> dict:
+    numqueries = max(1, state["breadth"])
+    res_format = "You have to return in XML format, one tag per query, example : <query>Quantum Computing breakthroughs</query><query>Quantum error correction milestones</query>"
+    prompt = f"User Prompt : {state['results']}\n---------\nGiven the following prompt from the user, generate a list of SERP queries to research the topic. Return a maximum of {numqueries} queries, but feel free to return less if the original prompt is clear.\n{res_format}\nMake sure each query is unique and not similar to each other:"
+    res = await agenerate_llm_response(system_prompt=system_prompt,user_prompt=prompt, memoize=True, node="serp_queries")
+    queries = []
+    for query in re.findall(r"<query>(.*?)</query>", res, flags=re.DOTALL):
+        query = query.strip()
+        if query and query not in queries:
+            queries.append(query)
+    # Fall back to the current query if the model ignored the format.
+    queries = queries[:numqueries] or [state["query"]]
+    return {"queries": queries, "query": queries[0]}
+
+# Move crawled page bodies into the content store and return their compact page entries.
+def store_pages(documents: list, deduper) -> list:
+    # Pages already processed earlier in the run (or near-copies) are dropped.
+    return [{"url": document["url"], "title": document["title"], "ref": content_store.put_text(document["markdown"])}
+            for document in deduper.filter(documents)]
+
+# Yield (query, page) pairs as soon as each page is crawled; pages carry refs, not bodies.
+# A query whose crawl fails is recorded in `failed_queries` and skipped, like a failed page.
+async def astream_pages(queries: list, run_context, sources: list, failed_queries: list):
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_QUERIES)
+    # (query, documents) batches from every crawl; documents is None once a query is done.
+    batches = asyncio.Queue()
+
+    async def crawl(query: str):
+        try:
+            async with semaphore:
+                if SEARCH_MODE == "two_phase":
+                    # Only the best-ranked snippets not already seen this run are scraped,
+                    # and each page is passed on as soon as its own scrape finishes.
+                    documents = astream_two_phase(query, rank=run_context.index.rank,
+                                                  skip_url=run_context.deduper.is_known_url)
+                    try:
+                        async for document in documents:
+                            batches.put_nowait((query, [document]))
+                        # Registers the query's source even when nothing was scraped.
+                        batches.put_nowait((query, []))
+                    finally:
+                        await documents.aclose()
+                else:
+                    batches.put_nowait((query, extract_documents(await acrawl_firechain(query))))
+        except Exception as error:
+            count("crawl.query_failures")
+            failed_queries.append({"query": query, "error": f"{type(error).__name__}: {error}"})
+        finally:
+            batches.put_nowait((query, None))
+
+    tasks = [asyncio.create_task(crawl(query)) for query in queries]
+    query_sources = {}
+    try:
+        running = len(tasks)
+        while running:
+            query, documents = await batches.get()
+            if documents is None:
+                running -= 1
+                continue
+            if query not in query_sources:
+                query_sources[query] = {"query": query, "pages": []}
+                sources.append(query_sources[query])
+            pages = await asyncio.to_thread(store_pages, documents, run_context.deduper) if documents else []
+            query_sources[query]["pages"].extend(pages)
+            for page in pages:
+                yield query, page
+    finally:
+        # Closing the generator early (or a failure downstream) must not leave crawls running.
+        for task in tasks:
+            task.cancel()
+
+# Load a stored page and pack its most query-relevant chunks into the per-page budget.
+def page_context(query: str, page: dict, rank) -> str:
+    document = {**page, "markdown": content_store.get_text(page["ref"])}
+    return build_context(query, [document], PAGE_TOKEN_BUDGET, rank=rank)
+
+# Map step for process_results: summarize a single page as soon as it arrives.
+async def summarize_page(query: str, page: dict, run_context, semaphore: asyncio.Semaphore) -> dict:
+    async with semaphore:
+        # Only the chunks most similar to the query, packed into a per-page token budget.
+        # Embedding is CPU-bound, so it runs off the event loop; the page body is
+        # read from the store only now, so waiting pages hold just their refs.
+        with span("build_context", "context", pages=1):
+            context = await asyncio.to_thread(page_context, query, page, run_context.index.rank)
+        if not context:
+            return None
+        prompt = "".join((f"Summarize the following page in bullet points, keeping only what is relevant to '{query}'. ", "Highlight key learnings and potential directions.\n\n", f"{context}"))
+        summary = await agenerate_llm_response(system_prompt=system_prompt, user_prompt=prompt, memoize=True, node="summarize_page")
+    return {"url": page["url"], "title": page["title"], "query": query, "text": summary, "tokens": count_tokens(summary)}
+
+# Node: Process Results - stream pages from every query's crawl into concurrent
+# per-page summaries (map), then merge them into the learnings (reduce).
+async def process_results(state: ResearchAgentState) -> dict:
+    queries = state.get("queries") or [state["query"]]
+    run_context = get_run_context(state["run_id"])
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_SUMMARIES)
+    sources, failed_queries, map_tasks = [], [], []
+    pages = astream_pages(queries, run_context, sources, failed_queries)
+    # Crawls and summaries overlap: each page is handed to the LLM while other crawls are still running.
+    try:
+        async for query, page in pages:
+            map_tasks.append(asyncio.create_task(summarize_page(query, page, run_context, semaphore)))
+    except BaseException:
+        for task in map_tasks:
+            task.cancel()
+        raise
+    finally:
+        await pages.aclose()
+    outputs = await asyncio.gather(*map_tasks, return_exceptions=True)
+    summaries = [output for output in outputs if isinstance(output, dict)]
+    failed = sum(isinstance(output, BaseException) for output in outputs)
+    update = {"sources": (state.get("sources") or []) + sources}
+
+    # Reduce step: merge the per-page summaries that fit the budget into one set of learnings.
+    if summaries:
+        ranked = await asyncio.to_thread(run_context.index.rank, state["query"], summaries)
+        packed = pack_chunks(ranked, CONTEXT_TOKEN_BUDGET)
+        findings = "\n\n".join(f"Source: {summary['title']} ({summary['url']}) for query '{summary['query']}'\n{summary['text']}" for summary in packed)
+        prompt = "".join(("Merge the following per-page research summaries into one set of bullet points. ", "Remove duplicates, keep the most specific facts, and highlight key learnings and potential directions.\n\n", f"{findings}"))
+        update["learnings"] = await agenerate_llm_response(system_prompt=system_prompt, user_prompt=prompt, node="process_results")
+        # Keep every iteration's learnings searchable for the next learner_node.
+        await asyncio.to_thread(run_context.index.add, split_learnings(update["learnings"]), "learning")
+
+    stats = dict(state.get("stats") or {})
+    stats.update(run_context.deduper.stats())
+    stats["pages_summarized"] = stats.get("pages_summarized", 0) + len(summaries)
+    stats["page_summaries_failed"] = stats.get("page_summaries_failed", 0) + failed
+    stats["crawl_queries_failed"] = stats.get("crawl_queries_failed", 0) + len(failed_queries)
+    update["stats"] = stats
+    return update
 
 # Node: Compile Results - generate potential directions based on the learnings.
-def compile_results(state: ResearchAgentState) -> ResearchAgentState:
+async def compile_results(state: ResearchAgentState) -> dict:
     prompt = (
         f"Based on these learnings:\n{state['learnings']}\nList 3 next directions or deeper questions to explore."
     )
-    response = generate_llm_response(system_prompt=system_prompt, user_prompt=prompt)
-    state["directions"] = response
-    return state
+    response = await agenerate_llm_response(system_prompt=system_prompt, user_prompt=prompt, memoize=True, node="compile_results")
+    # Share of this iteration's learnings and directions that earlier iterations did not already say.
+    tracker = get_run_context(state["run_id"]).novelty
+    novelty = await asyncio.to_thread(tracker.update, f"{state['learnings']}\n{response}")
+    stats = dict(state.get("stats") or {})
+    stats["iterations"] = stats.get("iterations", 0) + 1
+    return {"directions": response, "novelty": novelty, "stats": stats}
+
+# Node: Novelty Gate - in adaptive mode, skip the remaining depth once an
+# iteration adds too little new information.
+def novelty_gate(state: ResearchAgentState) -> dict:
+    if state.get("stop_mode") != "adaptive" or state["depth"] <= 0 or state.get("novelty", 1.0) >= NOVELTY_THRESHOLD:
+        return {}
+    stats = dict(state.get("stats") or {})
+    iterations = max(1, stats.get("iterations", 1))
+    # Each iteration costs learner + serp + reduce + compile calls plus one map call per page, and one crawl per query.
+    llm_calls_saved = state["depth"] * round(4 + stats.get("pages_summarized", 0) / iterations)
+    crawl_calls_saved = state["depth"] * len(state.get("queries") or [state["query"]])
+    stats.update(stopped_early=True, iterations_skipped=state["depth"],
+                 llm_calls_saved=llm_calls_saved, crawl_calls_saved=crawl_calls_saved)
+    count("early_stop.iterations_skipped", state["depth"])
+    count("early_stop.llm_calls_saved", llm_calls_saved)
+    count("early_stop.crawl_calls_saved", crawl_calls_saved)
+    # depth 0 makes check_depth route straight to markdown_report.
+    return {"stats": stats, "depth": 0}
 
 # Node: Check Depth - conditional function to decide the next node.
 def check_depth(state: ResearchAgentState):
@@ -84,73 +273,197 @@ def check_depth(state: ResearchAgentState):
     return "next_direction" if state["depth"] > 0 else "markdown_report"
 
 # Node: Next Direction - refine the query and reduce the depth.
-def next_direction(state: ResearchAgentState) -> ResearchAgentState:
-    state["depth"] -= 1  # Decrement depth
-    state["query"] = f"{state['query']} + (refined with new subtopics)"
-    return state
+def next_direction(state: ResearchAgentState) -> dict:
+    return {
+        "depth": state["depth"] - 1,  # Decrement depth
+        "query": f"{state['query']} + (refined with new subtopics)",
+    }
 
 # Node: Markdown Report - compile the final report.
-def markdown_report(state: ResearchAgentState) -> ResearchAgentState:
+async def markdown_report(state: ResearchAgentState, writer: StreamWriter) -> dict:
+    # Report tokens go out on the "custom" stream as they are generated.
+    def on_token(token):
+        writer({"report_reset": True} if token is None else {"report_token": token})
+
     md_report = ''.join(('-Final Report\n\n', f"- Query\n{state['query']}\n\n", f"- Key Learnings\n{state['learnings']}\n\n"))
     report_prompt = ''.join(("Generate a markdown report based on the research findings. ", "Include the query, key learnings, and potential solutions you have found.", f"{md_report}"))
-    md_report_llm = generate_llm_response(system_prompt=system_prompt, user_prompt=report_prompt)
-    state["report"] = md_report_llm
-    return state
+    md_report_llm = await agenerate_llm_response(system_prompt=system_prompt, user_prompt=report_prompt, node="markdown_report", on_token=on_token)
+    return {"report": md_report_llm}
 
 # -------------------------------
 # Build the LangGraph state graph
 # -------------------------------
-graph = StateGraph(state_schema=ResearchAgentState)
-
-# Add nodes to the graph.
-graph.add_node("input", input_node)
-graph.add_node("learner_node", learner_node)
-graph.add_node("serp_queries", serp_queries)
-graph.add_node("process_results", process_results)
-graph.add_node("compile_results", compile_results)
-graph.add_node("check_depth", lambda state: state)  # 'check_depth' node passes state unchanged.
-graph.add_node("next_direction", next_direction)
-graph.add_node("markdown_report", markdown_report)
-
-# Define explicit edges between nodes.
-graph.add_edge(START, "input")
-graph.add_edge("input", "learner_node")
-graph.add_edge("learner_node", "serp_queries")
-graph.add_edge("serp_queries", "process_results")
-graph.add_edge("process_results", "compile_results")
-graph.add_edge("compile_results", "check_depth")
-
-# Add conditional edges: the 'check_depth' node uses the `check_depth` function to decide the next step.
-graph.add_conditional_edges(
-    "check_depth", 
-    check_depth, 
-    path_map={
-        "next_direction": "next_direction",
-        "markdown_report": "markdown_report"
-    }
-)
+# The graph is built and compiled on first use, once per process, so importing
+# this module stays cheap and runs do not pay for compile() again.
+@lru_cache(maxsize=None)
+def build_graph() -> StateGraph:
+    graph = StateGraph(state_schema=ResearchAgentState)
 
-# Connect the 'next_direction' node back to 'learner_node' for further iterations.
-graph.add_edge("next_direction", "learner_node")
+    # Add nodes to the graph.
+    graph.add_node("input", traced_node("input", input_node))
+    graph.add_node("learner_node", traced_node("learner_node", learner_node))
+    graph.add_node("serp_queries", traced_node("serp_queries", serp_queries))
+    graph.add_node("process_results", traced_node("process_results", process_results))
+    graph.add_node("compile_results", traced_node("compile_results", compile_results))
+    graph.add_node("check_depth", traced_node("check_depth", novelty_gate))  # 'check_depth' node may end adaptive runs early.
+    graph.add_node("next_direction", traced_node("next_direction", next_direction))
+    graph.add_node("markdown_report", traced_node("markdown_report", markdown_report))
 
-# Finally, connect the 'markdown_report' node to END.
-graph.add_edge("markdown_report", END)
+    # Define explicit edges between nodes.
+    graph.add_edge(START, "input")
+    graph.add_edge("input", "learner_node")
+    graph.add_edge("learner_node", "serp_queries")
+    graph.add_edge("serp_queries", "process_results")
+    graph.add_edge("process_results", "compile_results")
+    graph.add_edge("compile_results", "check_depth")
+
+    # Add conditional edges: the 'check_depth' node uses the `check_depth` function to decide the next step.
+    graph.add_conditional_edges(
+        "check_depth", 
+        check_depth, 
+        path_map={
+            "next_direction": "next_direction",
+            "markdown_report": "markdown_report"
+        }
+    )
+
+    # Connect the 'next_direction' node back to 'learner_node' for further iterations.
+    graph.add_edge("next_direction", "learner_node")
+
+    # Finally, connect the 'markdown_report' node to END.
+    graph.add_edge("markdown_report", END)
+    return graph
+
+@lru_cache(maxsize=None)
+def _compiled_graph():
+    return build_graph().compile()
+
+def get_compiled_graph(checkpointer=None):
+    """Return the process-wide compiled graph, bound to `checkpointer` for this run."""
+    compiled = _compiled_graph()
+    # copy() is a shallow copy, far cheaper than compiling again.
+    return compiled if checkpointer is None else compiled.copy(update={"checkpointer": checkpointer})
+
+def __getattr__(name):
+    # `graph` used to be built at import time; keep it importable.
+    if name == "graph":
+        return build_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# ---------------------------------
+# Drivers : stream the graph asynchronously, or synchronously for existing callers.
+# ---------------------------------
+_GRAPH_DONE = object()
+
+# Rebuild a resumed run's in-memory context from its checkpointed state: pages it
+# already crawled stay deduplicated, and its learnings stay searchable and count
+# as already-seen text for the novelty gate.
+def seed_run_context(state: ResearchAgentState):
+    run_context = get_run_context(state["run_id"])
+    run_context.deduper.mark_seen(page["url"] for source in state.get("sources") or [] for page in source["pages"])
+    if state.get("learnings"):
+        run_context.index.add(split_learnings(state["learnings"]), "learning")
+        run_context.novelty.update(f"{state['learnings']}\n{state.get('directions') or ''}")
+
+@asynccontextmanager
+async def open_checkpointer():
+    try:
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError:
+        warnings.warn("langgraph-checkpoint-sqlite is not installed; research runs will not be resumable.")
+        yield None
+        return
+    os.makedirs(os.path.dirname(CHECKPOINT_PATH) or ".", exist_ok=True)
+    async with AsyncSqliteSaver.from_conn_string(CHECKPOINT_PATH) as checkpointer:
+        yield checkpointer
+
+async def run_graph(initial_state: ResearchAgentState, run_id: str, trace: Trace, timeout: float,
+                    stream_mode, emit):
+    # Interrupted runs resume from their last finished node; finished runs are
+    # replayed straight from the checkpoint without any LLM or crawl calls.
+    config = {"configurable": {"thread_id": run_id}}
+    # `timeout` becomes a deadline that every LLM and crawl call in the run respects.
+    with start_trace(trace), deadline(timeout):
+        try:
+            async with open_checkpointer() as checkpointer:
+                compiled = get_compiled_graph(checkpointer)
+                graph_input = {**initial_state, "run_id": run_id}
+                if checkpointer is not None:
+                    await asyncio.to_thread(touch_checkpoint, run_id)
+                    snapshot = await compiled.aget_state(config)
+                    if snapshot.values and not snapshot.next:
+                        event = {"markdown_report": snapshot.values}
+                        emit(("updates", event) if isinstance(stream_mode, list) else event)
+                        return
+                    if snapshot.next:
+                        graph_input = None
+                        await asyncio.to_thread(seed_run_context, snapshot.values)
+                async for event in compiled.astream(graph_input, config, stream_mode=stream_mode):
+                    emit(event)
+        finally:
+            # Whether the run finished, failed, timed out or was cancelled, its
+            # scratch space is dropped; a later resume rebuilds it from the checkpoint.
+            release_run_context(run_id)
+            if trace is not None and trace.spans:
+                trace.export()
+
+async def astream_research(initial_state: ResearchAgentState, run_id: str = None, trace: Trace = None,
+                           timeout: float = RESEARCH_TIMEOUT, stream_mode="updates"):
+    # stream_mode is passed to LangGraph: "updates" yields {node: delta} events;
+    # a list such as ["updates", "custom"] yields (mode, chunk) pairs, where the
+    # "custom" chunks carry live report tokens.
+    run_id = run_id or initial_state.get("run_id") or uuid.uuid4().hex
+    # Every node and external call is timed into the run's trace, which is
+    # exported to TRACE_DIR as a Chrome trace plus a summary when the run ends.
+    if trace is None and TRACE_ENABLED:
+        trace = Trace(run_id)
+    # The graph runs in its own task, so the trace and deadline context vars are
+    # set and reset inside that task rather than across this generator's yields.
+    # A consumer that stops early (or never closes the generator) only cancels it.
+    events = asyncio.Queue()
+    task = asyncio.create_task(run_graph(initial_state, run_id, trace, timeout, stream_mode, events.put_nowait))
+    task.add_done_callback(lambda _: events.put_nowait(_GRAPH_DONE))
+    try:
+        while True:
+            event = await events.get()
+            if event is _GRAPH_DONE:
+                break
+            yield event
+        task.result()
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.wait([task])
+
+def stream_research(initial_state: ResearchAgentState, run_id: str = None, trace: Trace = None,
+                    timeout: float = RESEARCH_TIMEOUT, stream_mode="updates"):
+    # Runs on the shared background event loop, so many sessions share one loop.
+    yield from iterate_sync(astream_research(initial_state, run_id=run_id, trace=trace, timeout=timeout, stream_mode=stream_mode))
 
 # ---------------------------------
 # Test Query for Backend : Execute the graph with an initial state.
 # ---------------------------------
 if __name__ == "__main__":
     initial_state: ResearchAgentState = {
+    "run_id": "",
     "depth": 1,  # For example, perform one round of refinement.
     "breadth": 3,
     "query": "Quantum Computing breakthroughs",
+    "queries": [],
     "results": "",
+    "sources": [],
     "directions": "",
     "learnings": "",
-    "report": ""
+    "report": "",
+    "stats": {},
+    "stop_mode": "fixed",
+    "novelty": 1.0
     }
-    final_state = graph.compile()
-    for event in final_state.stream(initial_state):
-        for value in event.values():
-            print(value)
-            print("-" * 10)
\ No newline at end of file
+
+    async def main():
+        async for event in astream_research(initial_state):
+            for value in event.values():
+                print(value)
+                print("-" * 10)
+
+    asyncio.run(main())
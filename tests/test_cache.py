@@ -0,0 +1,55 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+Tests for the TTL, LRU eviction and counters of utils/cache.py's DiskCache.
+"""
+
+import time
+import pytest
+from utils import cache
+from utils.cache import DiskCache, make_key
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+def test_entry_expires_after_ttl(tmp_path, clock):
+    store = DiskCache("test", path=str(tmp_path / "cache.sqlite"), ttl=60)
+    store.set("key", {"value": 1})
+    clock[0] += 59
+    assert store.get("key") == (True, {"value": 1})
+    clock[0] += 2
+    assert store.get("key") == (False, None)
+    assert store.stats()["entries"] == 0
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    store = DiskCache("test", path=str(tmp_path / "cache.sqlite"), max_entries=2)
+    for key in ("a", "b"):
+        store.set(key, key)
+        clock[0] += 1
+    store.get("a")
+    clock[0] += 1
+    store.set("c", "c")
+    assert store.get("b") == (False, None)
+    assert store.get("a") == (True, "a")
+    assert store.get("c") == (True, "c")
+
+def test_counters_and_namespaces(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    store, other = DiskCache("test", path=path), DiskCache("other", path=path)
+    store.set("key", "value")
+    store.get("key")
+    store.get("missing")
+    assert other.get("key") == (False, None)
+    assert store.stats() == {"hits": 1, "misses": 1, "entries": 1}
+    store.clear()
+    assert store.stats() == {"hits": 0, "misses": 0, "entries": 0}
+
+def test_make_key_ignores_dict_order():
+    assert make_key("q", {"a": 1, "b": 2}) == make_key("q", {"b": 2, "a": 1})
+    assert make_key("q", 1) != make_key("q", 2)
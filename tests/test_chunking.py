@@ -0,0 +1,53 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+Tests for boilerplate stripping and token-budget packing in utils/chunking.py.
+"""
+
+from utils.chunking import pack_chunks, strip_boilerplate
+
+PAGE = """[Home](https://example.com) | [Blog](https://example.com/blog) | [About](https://example.com/about)
+![logo](https://example.com/logo.png)
+Home
+Products
+Pricing
+Careers
+
+# Installing the client
+
+The client needs Python 3.9 and a running server; see [the docs](https://example.com/docs) for details.
+
+- Fast
+- Typed
+
+| Flag | Default |
+|------|---------|
+| -v   | off     |
+
+```
+pip install
+client
+```
+
+Cookie policy
+"""
+
+def test_strip_boilerplate_keeps_content():
+    text = strip_boilerplate(PAGE)
+    for kept in ("# Installing the client", "see the docs for details", "- Fast", "- Typed",
+                 "| -v   | off     |", "pip install\nclient"):
+        assert kept in text
+    for dropped in ("https://", "logo", "Blog", "Careers", "Pricing", "Cookie policy"):
+        assert dropped not in text
+
+def test_strip_boilerplate_keeps_short_lines_outside_nav_runs():
+    assert strip_boilerplate("Results\n\nThe method works on every benchmark we tried.") == \
+        "Results\n\nThe method works on every benchmark we tried."
+
+def test_pack_chunks_respects_budget_in_rank_order():
+    ranked = [{"text": "a", "tokens": 60}, {"text": "b", "tokens": 50}, {"text": "c", "tokens": 30}]
+    assert [chunk["text"] for chunk in pack_chunks(ranked, token_budget=100)] == ["a", "c"]
+    assert pack_chunks(ranked, token_budget=10) == []
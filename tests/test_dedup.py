@@ -0,0 +1,41 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+Tests for URL canonicalization and near-duplicate detection in utils/dedup.py.
+"""
+
+from utils.dedup import ContentDeduper, canonicalize_url
+
+PAGE = " ".join(f"Sentence {i} explains how quantum error correction protects logical qubits." for i in range(30))
+
+def test_canonicalize_drops_tracking_params_only():
+    assert canonicalize_url("http://www.Example.com/post/?utm_source=x&fbclid=1#top") == "https://example.com/post"
+    assert canonicalize_url("https://example.com/watch?v=1&ref=home&source=feed") == \
+        "https://example.com/watch?ref=home&source=feed&v=1"
+
+def test_same_url_is_duplicate():
+    deduper = ContentDeduper()
+    kept = deduper.filter([
+        {"url": "https://example.com/a", "markdown": "first page"},
+        {"url": "https://www.example.com/a/?utm_medium=mail", "markdown": "other words entirely"},
+    ])
+    assert [document["markdown"] for document in kept] == ["first page"]
+    assert deduper.is_known_url("http://example.com/a")
+
+def test_near_copy_is_duplicate():
+    deduper = ContentDeduper()
+    kept = deduper.filter([
+        {"url": "https://example.com/a", "markdown": PAGE},
+        {"url": "https://mirror.example.org/a", "markdown": PAGE + " Share this article."},
+        {"url": "https://example.com/b", "markdown": "A different page about superconducting transmon qubits and their coherence."},
+    ])
+    assert [document["url"] for document in kept] == ["https://example.com/a", "https://example.com/b"]
+    assert deduper.stats() == {"pages_skipped": 1, "bytes_saved": len(PAGE) + len(" Share this article.")}
+
+def test_mark_seen_skips_urls_from_earlier_runs():
+    deduper = ContentDeduper()
+    deduper.mark_seen(["https://example.com/a"])
+    assert deduper.filter([{"url": "https://example.com/a/", "markdown": "new text"}]) == []
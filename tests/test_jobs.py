@@ -0,0 +1,51 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+Tests for the per-session and global limits and cancellation in utils/jobs.py.
+Jobs stay queued forever here: `_run` is replaced so the graph is never loaded.
+"""
+
+import asyncio
+import concurrent.futures
+import pytest
+from utils.jobs import JobLimitError, JobManager
+
+@pytest.fixture
+def manager(monkeypatch):
+    async def idle(self, job, initial_state):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(JobManager, "_run", idle)
+    jobs = JobManager(max_concurrent=1, max_per_session=1, max_queued=1)
+    yield jobs
+    for job in jobs.jobs.values():
+        job.future.cancel()
+
+def test_session_limit(manager):
+    manager.submit("session-a", {}, run_id="run-1")
+    with pytest.raises(JobLimitError):
+        manager.submit("session-a", {}, run_id="run-2")
+
+def test_submit_attaches_to_active_run(manager):
+    job = manager.submit("session-a", {}, run_id="run-1")
+    assert manager.submit("session-b", {}, run_id="run-1") is job
+    assert manager.find("run-1") is job
+    assert len(manager.active_jobs()) == 1
+
+def test_global_limit(manager):
+    manager.submit("session-a", {}, run_id="run-1")
+    manager.submit("session-b", {}, run_id="run-2")
+    with pytest.raises(JobLimitError):
+        manager.submit("session-c", {}, run_id="run-3")
+
+def test_cancel_queued_job_frees_its_session(manager):
+    job = manager.submit("session-a", {}, run_id="run-1")
+    manager.cancel(job.job_id)
+    assert job.status == "cancelled"
+    assert manager.active_jobs("session-a") == []
+    with pytest.raises(concurrent.futures.CancelledError):
+        job.future.result(timeout=1)
+    assert manager.submit("session-a", {}, run_id="run-2").active
@@ -0,0 +1,105 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+Regression tests for the circuit breaker's half-open probe and request hedging
+in utils/resilience.py.
+"""
+
+import asyncio
+import time
+import pytest
+from utils import resilience
+from utils.resilience import (Backend, CircuitBreaker, CircuitOpenError, DeadlineExceeded, RetryPolicy,
+                              deadline, resilient_call)
+
+RESET_SECONDS = 0.05
+
+@pytest.fixture
+def backend(monkeypatch):
+    test_backend = Backend("test", RetryPolicy(attempts=1), CircuitBreaker(failure_threshold=1, reset_timeout=RESET_SECONDS))
+    monkeypatch.setitem(resilience._backends, "test", test_backend)
+    return test_backend
+
+def open_circuit(backend: Backend):
+    backend.breaker.record_failure()
+    assert backend.breaker.state == "open"
+    time.sleep(RESET_SECONDS * 1.5)
+    assert backend.breaker.state == "half_open"
+
+async def succeed():
+    return "ok"
+
+async def hang():
+    await asyncio.sleep(10)
+
+async def reject():
+    raise ValueError("bad request")
+
+def test_probe_timed_out_by_deadline_releases_slot(backend):
+    open_circuit(backend)
+
+    async def probe_then_call():
+        with pytest.raises(DeadlineExceeded):
+            with deadline(0.01):
+                await resilient_call("test", hang)
+        return await resilient_call("test", succeed)
+
+    assert asyncio.run(probe_then_call()) == "ok"
+    assert backend.breaker.state == "closed"
+
+def test_probe_with_client_error_releases_slot(backend):
+    open_circuit(backend)
+
+    async def probe_then_call():
+        with pytest.raises(ValueError):
+            await resilient_call("test", reject)
+        return await resilient_call("test", succeed)
+
+    assert asyncio.run(probe_then_call()) == "ok"
+
+def test_cancelled_probe_releases_slot(backend):
+    open_circuit(backend)
+
+    async def probe_then_call():
+        task = asyncio.ensure_future(resilient_call("test", hang))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await resilient_call("test", succeed)
+
+    assert asyncio.run(probe_then_call()) == "ok"
+
+def test_concurrent_call_rejected_while_probe_in_flight(backend):
+    open_circuit(backend)
+
+    async def probe_and_second_call():
+        task = asyncio.ensure_future(resilient_call("test", hang))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await resilient_call("test", succeed)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(probe_and_second_call())
+
+def test_hedged_request_cancelled_when_deadline_passes(backend):
+    backend.hedging, backend.hedge_min_samples = True, 1
+    backend.latencies.extend([0.5] * 5)
+    finished = []
+
+    async def slow():
+        await asyncio.sleep(0.3)
+        finished.append(True)
+
+    async def call_then_wait():
+        with pytest.raises(DeadlineExceeded):
+            with deadline(0.1):
+                await resilient_call("test", slow)
+        await asyncio.sleep(0.4)
+
+    asyncio.run(call_then_wait())
+    assert not finished
@@ -0,0 +1,72 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the shared asyncio runner that lets synchronous callers
+(Streamlit, scripts, notebooks) drive the async research layer.
+"""
+
+import asyncio
+import queue
+import threading
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="relearnweb-aio", daemon=True).start()
+    return _loop
+
+def run_sync(coro, timeout: float = None):
+    """Run a coroutine on the background loop and block until it finishes."""
+    loop = get_background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the background event loop; await the coroutine instead.")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+_DONE = object()
+
+def iterate_sync(agen):
+    """Expose an async generator as a regular generator driven by the background loop.
+
+    The generator is pumped by a single task, so context variables set inside it
+    (e.g. the active trace) stay visible for its whole lifetime.
+    """
+    loop = get_background_loop()
+    items = queue.Queue()
+
+    async def pump():
+        try:
+            async for item in agen:
+                items.put((item, None))
+        except Exception as error:
+            items.put((_DONE, error))
+        else:
+            items.put((_DONE, None))
+        finally:
+            await agen.aclose()
+
+    future = asyncio.run_coroutine_threadsafe(pump(), loop)
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        # Stops the producer when the caller breaks out early.
+        future.cancel()
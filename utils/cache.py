@@ -0,0 +1,109 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains a small SQLite-backed TTL/LRU cache shared by every
+process serving the app (Streamlit workers, scripts, notebooks).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.getenv("RELEARNWEB_CACHE_DIR", ".cache")
+
+def make_key(*parts) -> str:
+    """Stable hash of any JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class DiskCache:
+    """Namespaced key/value cache with a TTL, LRU eviction and hit/miss counters.
+
+    SQLite in WAL mode handles locking, so several processes can share one file.
+    """
+
+    def __init__(self, namespace: str, path: str = None, ttl: float = None, max_entries: int = None):
+        self.namespace = namespace
+        self.path = path or os.path.join(CACHE_DIR, "cache.sqlite")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (namespace TEXT, key TEXT, value TEXT, "
+                "created REAL, accessed REAL, PRIMARY KEY (namespace, key))")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (namespace, accessed)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters (namespace TEXT, name TEXT, value INTEGER, "
+                "PRIMARY KEY (namespace, name))")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, conn: sqlite3.Connection, name: str):
+        conn.execute(
+            "INSERT INTO counters VALUES (?, ?, 1) "
+            "ON CONFLICT (namespace, name) DO UPDATE SET value = value + 1",
+            (self.namespace, name))
+
+    def get(self, key: str):
+        """Return `(hit, value)` for `key`, refreshing its LRU position on a hit."""
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, created FROM entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key)).fetchone()
+        if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            row = None
+        if row is None:
+            self._count(conn, "misses")
+            return False, None
+        conn.execute(
+            "UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?",
+            (now, self.namespace, key))
+        self._count(conn, "hits")
+        return True, json.loads(row[0])
+
+    def set(self, key: str, value):
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value, default=str), now, now))
+            if self.max_entries is not None:
+                conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key NOT IN ("
+                    "SELECT key FROM entries WHERE namespace = ? ORDER BY accessed DESC LIMIT ?)",
+                    (self.namespace, self.namespace, self.max_entries))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def stats(self) -> dict:
+        conn = self._connection()
+        stats = dict(conn.execute(
+            "SELECT name, value FROM counters WHERE namespace = ?", (self.namespace,)).fetchall())
+        stats["entries"] = conn.execute(
+            "SELECT COUNT(*) FROM entries WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+        return {"hits": stats.get("hits", 0), "misses": stats.get("misses", 0), "entries": stats["entries"]}
+
+    def clear(self):
+        conn = self._connection()
+        conn.execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+        conn.execute("DELETE FROM counters WHERE namespace = ?", (self.namespace,))
@@ -0,0 +1,77 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the housekeeping for the LangGraph checkpoint database:
+deleting one run's checkpoints and pruning runs nobody touched for
+CHECKPOINT_TTL seconds. The saver itself lives in relearnweb_backend.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from utils.cache import CACHE_DIR
+
+# Durable checkpoints of every finished node, keyed by run id.
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", os.path.join(CACHE_DIR, "checkpoints.sqlite"))
+CHECKPOINT_TTL = float(os.getenv("CHECKPOINT_TTL", 7 * 24 * 60 * 60))
+# Seconds between prune passes in one process.
+PRUNE_INTERVAL = 60 * 60
+# Tables written by langgraph-checkpoint-sqlite, both keyed by thread_id (our run id).
+SAVER_TABLES = ("checkpoints", "writes")
+
+_last_prune = 0.0
+_prune_lock = threading.Lock()
+
+def _connect(path: str = None) -> sqlite3.Connection:
+    path = path or CHECKPOINT_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    # The saver has no timestamps, so last use per run is tracked alongside its tables.
+    conn.execute("CREATE TABLE IF NOT EXISTS run_index (thread_id TEXT PRIMARY KEY, updated REAL)")
+    return conn
+
+def _delete(conn: sqlite3.Connection, run_ids: list):
+    for table in SAVER_TABLES + ("run_index",):
+        try:
+            conn.executemany(f"DELETE FROM {table} WHERE thread_id = ?", [(run_id,) for run_id in run_ids])
+        except sqlite3.OperationalError:
+            # The saver has not created this table yet.
+            pass
+
+def delete_checkpoint(run_id: str, path: str = None):
+    """Forget a run, so the next research with the same run id starts from scratch."""
+    conn = _connect(path)
+    try:
+        _delete(conn, [run_id])
+    finally:
+        conn.close()
+
+def prune_checkpoints(ttl: float = CHECKPOINT_TTL, path: str = None) -> int:
+    """Delete every run not touched for `ttl` seconds; return how many were removed."""
+    conn = _connect(path)
+    try:
+        expired = [row[0] for row in conn.execute("SELECT thread_id FROM run_index WHERE updated < ?",
+                                                  (time.time() - ttl,))]
+        _delete(conn, expired)
+        return len(expired)
+    finally:
+        conn.close()
+
+def touch_checkpoint(run_id: str, path: str = None):
+    """Record that `run_id` was used now, and prune expired runs at most every PRUNE_INTERVAL."""
+    global _last_prune
+    conn = _connect(path)
+    try:
+        conn.execute("INSERT OR REPLACE INTO run_index VALUES (?, ?)", (run_id, time.time()))
+    finally:
+        conn.close()
+    with _prune_lock:
+        due = time.time() - _last_prune > PRUNE_INTERVAL
+        if due:
+            _last_prune = time.time()
+    if due:
+        prune_checkpoints(path=path)
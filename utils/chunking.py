@@ -0,0 +1,193 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the preprocessing applied to crawled pages before they are
+summarized: boilerplate stripping, chunking, relevance scoring against the
+current query and packing the best chunks into a token budget.
+"""
+
+from functools import lru_cache
+import math
+import os
+import re
+from collections import Counter
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 4000))
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", 300))
+
+IMAGE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+LINK_PATTERN = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+BARE_URL_PATTERN = re.compile(r"https?://\S+")
+BOILERPLATE_PATTERN = re.compile(
+    r"cookie|privacy policy|terms of (use|service)|all rights reserved|subscribe|sign (in|up)|"
+    r"log ?in|newsletter|share (this|on)|follow us|skip to (main )?content|advertisement",
+    re.IGNORECASE)
+# A line made of nothing but links (menus, breadcrumbs, tag lists).
+LINK_ONLY_PATTERN = re.compile(r"^\s*(?:[-*+>]\s*)?(?:\[[^\]]*\]\([^)]*\)[\s|·•,/>-]*)+$")
+LIST_ITEM_PATTERN = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+# This many short lines in a row (outside lists, tables and code) are treated as a menu.
+NAV_RUN_LENGTH = 4
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS = frozenset((
+    "a an and are as at be by for from has have how in is it its of on or that the this to was "
+    "were what when where which who why will with"
+).split())
+
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    # tiktoken ships with langchain-openai; cl100k_base is close enough for the
+    # OpenAI-compatible models we target. None means "estimate instead".
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+def count_tokens(text: str) -> int:
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return math.ceil(len(text) / 4)
+    return len(tokenizer.encode(text, disallowed_special=()))
+
+def terms(text: str) -> list:
+    return [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+
+def is_short_fragment(stripped: str) -> bool:
+    return len(stripped.split()) <= 3 and not stripped.endswith((".", ":", "?", "!"))
+
+def strip_boilerplate(markdown: str) -> str:
+    """Drop images, link targets, navigation and footer lines from scraped markdown.
+
+    List items, table rows and fenced code are kept; short lines are dropped only
+    when they were pure links or part of a run of NAV_RUN_LENGTH short lines.
+    """
+    text = IMAGE_PATTERN.sub("", markdown or "")
+    lines, seen, run, in_code = [], set(), [], False
+
+    def flush_run():
+        if len(run) < NAV_RUN_LENGTH:
+            lines.extend(run)
+        run.clear()
+
+    for raw in text.splitlines():
+        if FENCE_PATTERN.match(raw):
+            flush_run()
+            in_code = not in_code
+            lines.append(raw.rstrip())
+            continue
+        if in_code:
+            lines.append(raw.rstrip())
+            continue
+        line = BARE_URL_PATTERN.sub("", LINK_PATTERN.sub(r"\1", raw)).rstrip()
+        if raw.lstrip().startswith("|"):
+            flush_run()
+            lines.append(line)
+            continue
+        if LINK_ONLY_PATTERN.match(raw):
+            continue
+        stripped = line.strip(" \t*-|#>")
+        if not stripped:
+            flush_run()
+            lines.append("")
+            continue
+        # Footers: boilerplate phrases, and lines repeated on the same page.
+        if len(stripped) < 40 and BOILERPLATE_PATTERN.search(stripped):
+            continue
+        if stripped in seen:
+            continue
+        seen.add(stripped)
+        if LIST_ITEM_PATTERN.match(line) or line.lstrip().startswith("#") or not is_short_fragment(stripped):
+            flush_run()
+            lines.append(line)
+        else:
+            run.append(line)
+    flush_run()
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+def split_chunks(text: str, max_tokens: int = CHUNK_TOKENS) -> list:
+    """Group paragraphs into chunks of at most `max_tokens`, splitting long paragraphs by sentence."""
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(sentence for sentence in SENTENCE_SPLIT.split(paragraph) if sentence.strip())
+
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        piece_tokens = count_tokens(piece)
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+def chunk_documents(documents: list, max_tokens: int = CHUNK_TOKENS) -> list:
+    """Turn crawled documents into chunk dicts with their source and token count."""
+    chunks = []
+    for document in documents:
+        for text in split_chunks(strip_boilerplate(document.get("markdown", "")), max_tokens):
+            chunks.append({
+                "url": document.get("url", ""),
+                "title": document.get("title", ""),
+                "text": text,
+                "tokens": count_tokens(text),
+            })
+    return chunks
+
+def rank_chunks(query: str, chunks: list) -> list:
+    """Order chunks by BM25 relevance to `query`, best first."""
+    if not chunks:
+        return []
+    query_terms = set(terms(query))
+    chunk_terms = [Counter(terms(chunk["text"])) for chunk in chunks]
+    average_length = sum(sum(counts.values()) for counts in chunk_terms) / len(chunks) or 1
+    document_frequency = Counter(term for counts in chunk_terms for term in counts.keys() & query_terms)
+    k1, b = 1.5, 0.75
+
+    scored = []
+    for index, counts in enumerate(chunk_terms):
+        length = sum(counts.values())
+        score = 0.0
+        for term in query_terms:
+            frequency = counts.get(term, 0)
+            if not frequency:
+                continue
+            idf = math.log(1 + (len(chunks) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += idf * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * length / average_length))
+        scored.append((score, -index, chunks[index]))
+    scored.sort(key=lambda item: item[:2], reverse=True)
+    return [chunk for _, _, chunk in scored]
+
+def pack_chunks(ranked_chunks: list, token_budget: int = CONTEXT_TOKEN_BUDGET) -> list:
+    """Greedily keep the best chunks that fit in `token_budget`."""
+    packed, used = [], 0
+    for chunk in ranked_chunks:
+        if used + chunk["tokens"] > token_budget:
+            continue
+        packed.append(chunk)
+        used += chunk["tokens"]
+    return packed
+
+def format_chunks(chunks: list) -> str:
+    return "\n\n".join(f"Source: {chunk['title']} ({chunk['url']})\n{chunk['text']}" for chunk in chunks)
+
+def build_context(query: str, documents: list, token_budget: int = CONTEXT_TOKEN_BUDGET,
+                  rank=rank_chunks) -> str:
+    """Strip, chunk, rank and pack `documents` into a prompt-ready context for `query`.
+
+    `rank(query, chunks)` can be swapped, e.g. for an embedding index's `rank`.
+    """
+    return format_chunks(pack_chunks(rank(query, chunk_documents(documents)), token_budget))
@@ -0,0 +1,108 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains a content-addressed blob store for page markdown. Graph
+state and checkpoints carry only the short references it hands out, so they
+stay small however much is crawled.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from utils.cache import CACHE_DIR
+
+CONTENT_STORE_DIR = os.getenv("CONTENT_STORE_DIR", os.path.join(CACHE_DIR, "content"))
+# Blobs unused for CONTENT_STORE_TTL seconds are deleted, and the least recently
+# used go first once the store exceeds CONTENT_STORE_MAX_BYTES.
+CONTENT_STORE_TTL = float(os.getenv("CONTENT_STORE_TTL", 24 * 60 * 60))
+CONTENT_STORE_MAX_BYTES = int(os.getenv("CONTENT_STORE_MAX_BYTES", 512 * 2 ** 20))
+# Seconds between prune passes, which run from put().
+PRUNE_INTERVAL = 5 * 60
+
+class ContentStore:
+    """Write-once files on disk, named by the sha256 of their content, with TTL and LRU eviction.
+
+    Identical payloads share one file, and every process serving the app can read
+    blobs written by the others.
+    """
+
+    def __init__(self, path: str = None, ttl: float = CONTENT_STORE_TTL, max_bytes: int = CONTENT_STORE_MAX_BYTES):
+        self.path = path or CONTENT_STORE_DIR
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    def _file(self, ref: str) -> str:
+        return os.path.join(self.path, ref[:2], ref)
+
+    def put(self, data: bytes) -> str:
+        ref = hashlib.sha256(data).hexdigest()
+        path = self._file(ref)
+        try:
+            # The modification time doubles as the last-use time for eviction.
+            os.utime(path)
+        except FileNotFoundError:
+            # New blob, or pruned since it was written: (re)write it.
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so readers never see a partial blob.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        if time.time() - self._last_prune > PRUNE_INTERVAL:
+            self.prune()
+        return ref
+
+    def get(self, ref: str) -> bytes:
+        path = self._file(ref)
+        with open(path, "rb") as blob:
+            data = blob.read()
+        # The modification time doubles as the last-use time for eviction.
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data
+
+    def put_text(self, text: str) -> str:
+        return self.put(text.encode("utf-8"))
+
+    def get_text(self, ref: str) -> str:
+        return self.get(ref).decode("utf-8")
+
+    def prune(self):
+        """Delete expired blobs, then the least recently used until the store fits `max_bytes`."""
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_prune = time.time()
+            blobs = []
+            for directory, _, names in os.walk(self.path):
+                for name in names:
+                    path = os.path.join(directory, name)
+                    try:
+                        info = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    blobs.append((info.st_mtime, info.st_size, path))
+            blobs.sort()
+            total = sum(size for _, size, _ in blobs)
+            cutoff = time.time() - self.ttl
+            for used, size, path in blobs:
+                if used >= cutoff and total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+        finally:
+            self._prune_lock.release()
+
+content_store = ContentStore()
@@ -0,0 +1,101 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the cross-iteration page dedup: canonical URLs plus simhash
+fingerprints, so pages seen earlier in a run (or near-copies of them) are not
+summarized again.
+"""
+
+import hashlib
+import re
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the visitor and never change the page.
+TRACKING_PARAMS = re.compile(r"^(utm_.*|fbclid|gclid|mc_.*)$", re.IGNORECASE)
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def canonicalize_url(url: str) -> str:
+    """Lowercase scheme/host, drop www, fragments, tracking params and trailing slashes."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    for default_port in (":80", ":443"):
+        if host.endswith(default_port):
+            host = host[:-len(default_port)]
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(key)))
+    path = parts.path.rstrip("/") or "/"
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+    return urlunsplit((scheme, host, path, query, ""))
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit simhash over word shingles."""
+    words = WORD_PATTERN.findall(text.lower())
+    shingles = [" ".join(words[i:i + shingle_size]) for i in range(max(1, len(words) - shingle_size + 1))]
+    weights = [0] * 64
+    for shingle in shingles:
+        digest = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        for bit in range(64):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+class ContentDeduper:
+    """Per-run seen-set of canonical URLs and content fingerprints."""
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self.seen_urls = set()
+        self.fingerprints = []
+        self.pages_skipped = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def mark_seen(self, urls):
+        with self._lock:
+            self.seen_urls.update(canonicalize_url(url) for url in urls if url)
+
+    def is_known_url(self, url: str) -> bool:
+        with self._lock:
+            return canonicalize_url(url) in self.seen_urls
+
+    def is_duplicate(self, document: dict) -> bool:
+        url = canonicalize_url(document["url"]) if document.get("url") else None
+        content = document.get("markdown", "")
+        fingerprint = simhash(content) if content.strip() else None
+        if url and url in self.seen_urls:
+            return True
+        if fingerprint is not None and any(hamming_distance(fingerprint, seen) <= self.max_distance
+                                           for seen in self.fingerprints):
+            if url:
+                self.seen_urls.add(url)
+            return True
+        if url:
+            self.seen_urls.add(url)
+        if fingerprint is not None:
+            self.fingerprints.append(fingerprint)
+        return False
+
+    def filter(self, documents: list) -> list:
+        """Return only documents not seen before, counting what was skipped."""
+        kept = []
+        with self._lock:
+            for document in documents:
+                if self.is_duplicate(document):
+                    self.pages_skipped += 1
+                    self.bytes_saved += len(document.get("markdown", "").encode("utf-8"))
+                else:
+                    kept.append(document)
+        return kept
+
+    def stats(self) -> dict:
+        return {"pages_skipped": self.pages_skipped, "bytes_saved": self.bytes_saved}
@@ -0,0 +1,144 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the local embedding index used to rank crawled chunks and
+accumulated learnings. Everything runs on the CPU without network access.
+"""
+
+from functools import lru_cache
+import hashlib
+import os
+import re
+import threading
+import numpy as np
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+HASHING_DIMENSIONS = int(os.getenv("HASHING_DIMENSIONS", 1024))
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def content_key(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+class HashingEmbedder:
+    """Signed feature hashing of word unigrams and bigrams, log-scaled and L2 normalized."""
+
+    name = "hashing"
+
+    def __init__(self, dimensions: int = HASHING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def embed(self, texts: list) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = WORD_PATTERN.findall(text.lower())
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            for feature in features:
+                digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                sign = 1.0 if digest & 1 else -1.0
+                vectors[row, (digest >> 1) % self.dimensions] += sign
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        return normalize_rows(vectors)
+
+class SentenceTransformerEmbedder:
+    """Small sentence-transformers model loaded from the local cache only."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu", local_files_only=True)
+
+    def embed(self, texts: list) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True)
+        return vectors.astype(np.float32)
+
+@lru_cache(maxsize=1)
+def get_embedder():
+    # sentence-transformers is optional; use it only if the model is already on disk.
+    if os.getenv("EMBEDDING_MODEL", EMBEDDING_MODEL) != "hashing":
+        try:
+            return SentenceTransformerEmbedder()
+        except Exception:
+            pass
+    return HashingEmbedder()
+
+class EmbeddingIndex:
+    """In-memory vector index with batched cosine top-k search.
+
+    Vectors are cached by content hash, so text seen in an earlier depth
+    iteration is never embedded twice.
+    """
+
+    def __init__(self, embedder=None):
+        self.embedder = embedder or get_embedder()
+        self.items = []
+        self.kinds = []
+        self.vectors = None
+        self._vector_cache = {}
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def embed(self, texts: list) -> np.ndarray:
+        keys = [content_key(text) for text in texts]
+        missing = list({key: text for key, text in zip(keys, texts) if key not in self._vector_cache}.items())
+        if missing:
+            vectors = self.embedder.embed([text for _, text in missing])
+            for (key, _), vector in zip(missing, vectors):
+                self._vector_cache[key] = vector
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([self._vector_cache[key] for key in keys])
+
+    def add(self, items: list, kind: str = "chunk"):
+        """Index dicts with a "text" field; items already indexed are skipped."""
+        with self._lock:
+            new_items = []
+            for item in items:
+                key = (kind, content_key(item["text"]))
+                if key not in self._keys:
+                    self._keys.add(key)
+                    new_items.append(item)
+            if not new_items:
+                return
+            vectors = self.embed([item["text"] for item in new_items])
+            self.vectors = vectors if self.vectors is None else np.vstack((self.vectors, vectors))
+            self.items.extend(new_items)
+            self.kinds.extend([kind] * len(new_items))
+
+    def search(self, queries, k: int = 5, kind: str = None) -> list:
+        """Top-k `(score, item)` pairs for one query, or a list of them for a list of queries."""
+        single = isinstance(queries, str)
+        query_list = [queries] if single else list(queries)
+        with self._lock:
+            if self.vectors is None or not query_list:
+                results = [[] for _ in query_list]
+                return results[0] if single else results
+            candidates = np.arange(len(self.items))
+            if kind is not None:
+                candidates = candidates[np.array(self.kinds) == kind]
+            scores = self.embed(query_list) @ self.vectors[candidates].T
+            results = []
+            for row in scores:
+                top = np.argsort(-row)[:k]
+                results.append([(float(row[i]), self.items[candidates[i]]) for i in top])
+        return results[0] if single else results
+
+    def rank(self, query: str, items: list) -> list:
+        """Order `items` by cosine similarity to `query`, reusing cached vectors."""
+        if not items:
+            return []
+        with self._lock:
+            vectors = self.embed([query] + [item["text"] for item in items])
+        scores = vectors[1:] @ vectors[0]
+        return [items[i] for i in np.argsort(-scores, kind="stable")]
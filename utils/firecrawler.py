@@ -7,9 +7,19 @@ Date: Feb 19th 2025
 This file contains the implementation of the Firecrawl search functionality.
 """
 
-from firecrawl import FirecrawlApp
 from dotenv import load_dotenv
+import asyncio
+import contextvars
+import functools
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.aio import run_sync
+from utils.cache import DiskCache, make_key
+from utils.chunking import rank_chunks
+from utils.ratelimit import throttle
+from utils.resilience import deadline, resilient_call
+from utils.tracing import count, current_trace, span
 
 # Load environment variables
 load_dotenv()
@@ -18,6 +28,37 @@ REQUIRED_ENV_VARS = {
     "FIRECRAWL_API_KEY": "Firecrawl API key for authentication"
 }
 
+# Search results are cached on disk, shared across processes. Set
+# FIRECRAWL_CACHE_DISABLED=1 to always hit Firecrawl.
+search_cache = DiskCache(
+    "firecrawl_search",
+    ttl=float(os.getenv("FIRECRAWL_CACHE_TTL", 24 * 60 * 60)),
+    max_entries=int(os.getenv("FIRECRAWL_CACHE_MAX_ENTRIES", 2000)),
+)
+scrape_cache = DiskCache(
+    "firecrawl_scrape",
+    ttl=float(os.getenv("FIRECRAWL_CACHE_TTL", 24 * 60 * 60)),
+    max_entries=int(os.getenv("FIRECRAWL_CACHE_MAX_ENTRIES", 2000)),
+)
+
+# One FirecrawlApp per API key; the environment is validated when it is built.
+_apps = {}
+_apps_lock = threading.Lock()
+
+# The SDK only ships a blocking client whose requests cannot be interrupted, so they run on
+# their own bounded pool: calls abandoned after a deadline can tie up at most
+# FIRECRAWL_MAX_WORKERS threads and never starve the loop's default executor.
+FIRECRAWL_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("FIRECRAWL_MAX_WORKERS", 8)),
+                                        thread_name_prefix="firecrawl")
+
+# "full" scrapes every search result; "two_phase" searches snippets only, ranks
+# them locally and scrapes just the best SCRAPE_TOP_K pages.
+SEARCH_MODE = os.getenv("SEARCH_MODE", "full")
+SNIPPET_LIMIT = int(os.getenv("SNIPPET_LIMIT", 20))
+SCRAPE_TOP_K = int(os.getenv("SCRAPE_TOP_K", 5))
+# Seconds allowed per scraped URL before falling back to its snippet.
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", 20))
+
 def validate_environment():
     missing_vars = [var for var, description in REQUIRED_ENV_VARS.items() 
                    if not os.getenv(var)]
@@ -25,29 +66,187 @@ def validate_environment():
         raise EnvironmentError(
             f"Missing required environment variables: {', '.join(missing_vars)}")
 
-def crawl_firechain(query: str, timeout: int = 15000, 
-                   limit: int = 5, verbose: bool = False) -> dict:
-    validate_environment()
-    
-    firecrawlapp = FirecrawlApp(
-        api_key=os.getenv("FIRECRAWL_API_KEY"),
-    )
+def get_firecrawl_app():
+    """Return the shared FirecrawlApp, validating the environment only when the key or URL changes."""
+    key = (os.getenv("FIRECRAWL_API_KEY"), os.getenv("FIRECRAWL_API_URL"))
+    app = _apps.get(key)
+    if app is None:
+        with _apps_lock:
+            app = _apps.get(key)
+            if app is None:
+                validate_environment()
+                # The SDK is imported on first use, so importing this module stays cheap.
+                from firecrawl import FirecrawlApp
+                app = _apps[key] = FirecrawlApp(api_key=key[0])
+    return app
+
+async def run_blocking(func, *args):
+    """Run a blocking SDK call on FIRECRAWL_EXECUTOR, keeping the caller's context vars."""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        FIRECRAWL_EXECUTOR, functools.partial(context.run, func, *args))
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+def cache_enabled(use_cache: bool = True) -> bool:
+    return use_cache and os.getenv("FIRECRAWL_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+def firecrawl_search(query: str, params: dict) -> dict:
+    firecrawlapp = get_firecrawl_app()
     
     search_results = firecrawlapp.search(
         query=query,
-        params={
-            "timeout": timeout,
-            "limit": limit,
-            "scrapeOptions": {"formats": ['markdown']},
-        }
+        params=params
     )
+
+    # Newer SDKs return pydantic models; store the plain dict form.
+    if hasattr(search_results, "model_dump"):
+        search_results = search_results.model_dump()
     
     return search_results
 
+def firecrawl_scrape(url: str, params: dict) -> dict:
+    firecrawlapp = get_firecrawl_app()
+    scrape_result = firecrawlapp.scrape_url(url, params=params)
+    if hasattr(scrape_result, "model_dump"):
+        scrape_result = scrape_result.model_dump()
+    return scrape_result
+
+def scrape_markdown(scrape_result) -> str:
+    if not isinstance(scrape_result, dict):
+        return ""
+    # Older APIs wrap the page in "data".
+    page = scrape_result.get("data") if isinstance(scrape_result.get("data"), dict) else scrape_result
+    return page.get("markdown") or ""
+
+def extract_documents(search_results) -> list:
+    """Normalize a Firecrawl search response into a list of {url, title, description, markdown} dicts."""
+    if isinstance(search_results, dict):
+        items = search_results.get("data") or []
+    elif isinstance(search_results, list):
+        items = search_results
+    else:
+        items = getattr(search_results, "data", None) or []
+
+    documents = []
+    for item in items:
+        if not isinstance(item, dict):
+            item = item.model_dump() if hasattr(item, "model_dump") else vars(item)
+        metadata = item.get("metadata") or {}
+        documents.append({
+            "url": item.get("url") or metadata.get("sourceURL") or metadata.get("url") or "",
+            "title": item.get("title") or metadata.get("title") or "",
+            "description": item.get("description") or metadata.get("description") or "",
+            "markdown": item.get("markdown") or "",
+        })
+    return documents
+
+async def acrawl_firechain(query: str, timeout: int = 15000, limit: int = 5, verbose: bool = False,
+                           use_cache: bool = True, scrape: bool = True) -> dict:
+    params = {
+        "timeout": timeout,
+        "limit": limit,
+    }
+    # Without scrapeOptions Firecrawl returns only url, title and description per result.
+    if scrape:
+        params["scrapeOptions"] = {"formats": ['markdown']}
+    key = make_key(normalize_query(query), params)
+    with span("crawl_firechain", "crawl") as trace_args:
+        search_results = None
+        if cache_enabled(use_cache):
+            hit, search_results = search_cache.get(key)
+            trace_args["cache_hit"] = hit
+            if hit and verbose:
+                print(f"Firecrawl cache hit for '{query}'")
+
+        if search_results is None:
+            # Fails fast on a missing key, before any retries.
+            get_firecrawl_app()
+
+            async def request():
+                await throttle("firecrawl")
+                return await run_blocking(firecrawl_search, query, params)
+
+            search_results = await resilient_call("firecrawl", request)
+
+            if cache_enabled(use_cache) and search_results:
+                search_cache.set(key, search_results)
+
+        if current_trace() is not None:
+            documents = extract_documents(search_results)
+            trace_args["results"] = len(documents)
+            trace_args["payload_bytes"] = sum(len(document["markdown"]) + len(document["description"]) for document in documents)
+
+    return search_results
+
+async def ascrape_page(url: str, timeout: float = SCRAPE_TIMEOUT, use_cache: bool = True) -> str:
+    """Fetch one page's markdown, giving up after `timeout` seconds."""
+    params = {"formats": ["markdown"], "timeout": int(timeout * 1000)}
+    key = make_key(url, params)
+    with span("scrape_url", "crawl") as trace_args:
+        if cache_enabled(use_cache):
+            hit, markdown = scrape_cache.get(key)
+            trace_args["cache_hit"] = hit
+            if hit:
+                return markdown
+
+        get_firecrawl_app()
+
+        async def request():
+            await throttle("firecrawl")
+            return await run_blocking(firecrawl_scrape, url, params)
+
+        with deadline(timeout):
+            markdown = scrape_markdown(await resilient_call("firecrawl", request))
+
+        if cache_enabled(use_cache) and markdown:
+            scrape_cache.set(key, markdown)
+        trace_args["payload_bytes"] = len(markdown.encode("utf-8"))
+    return markdown
+
+async def astream_two_phase(query: str, rank=rank_chunks, top_k: int = SCRAPE_TOP_K, limit: int = SNIPPET_LIMIT,
+                            skip_url=None, scrape_timeout: float = SCRAPE_TIMEOUT, use_cache: bool = True):
+    """Search snippets only, rank them against `query` locally, and scrape the best `top_k` in parallel.
+
+    `rank(query, items)` orders dicts by their "text"; `skip_url(url)` drops candidates
+    before they are scraped. Yields documents shaped like `extract_documents` output as
+    each scrape finishes; closing the generator cancels the scrapes still running.
+    """
+    snippets = await acrawl_firechain(query, limit=limit, use_cache=use_cache, scrape=False)
+    candidates = [{**document, "text": f"{document['title']}\n{document['description']}"}
+                  for document in extract_documents(snippets)
+                  if document["url"] and not (skip_url and skip_url(document["url"]))]
+    selected = (await asyncio.to_thread(rank, query, candidates))[:top_k] if candidates else []
+    count("crawl.scrapes_avoided", len(candidates) - len(selected))
+
+    async def scrape(candidate: dict) -> dict:
+        try:
+            markdown = await ascrape_page(candidate["url"], timeout=scrape_timeout, use_cache=use_cache)
+        except Exception:
+            # A slow or failing page keeps its snippet instead of holding up the query.
+            count("crawl.scrape_failures")
+            markdown = ""
+        return {"url": candidate["url"], "title": candidate["title"], "description": candidate["description"],
+                "markdown": markdown or candidate["description"]}
+
+    tasks = [asyncio.ensure_future(scrape(candidate)) for candidate in selected]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def crawl_firechain(query: str, timeout: int = 15000, 
+                   limit: int = 5, verbose: bool = False, use_cache: bool = True) -> dict:
+    return run_sync(acrawl_firechain(query, timeout=timeout, limit=limit, verbose=verbose, use_cache=use_cache))
+
 # To test this function, run the following command:
 if __name__ == "__main__":
     response = crawl_firechain(
         query="How to make a Flutter Firebase Riverpod App?",
         verbose=True
     )
-    print(response)
\ No newline at end of file
+    print(response)
+    print(search_cache.stats())
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the background research job manager used by the Streamlit
+app. Jobs run as tasks on the shared event loop, so a Streamlit rerun never
+interrupts them and a session only polls their progress.
+"""
+
+from dataclasses import dataclass, field
+import asyncio
+import os
+import threading
+import time
+import uuid
+from utils.aio import get_background_loop
+from utils.tracing import Trace
+
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", 4))
+# Streamlit gives no user identity, so jobs are limited per session (browser tab), not per person.
+MAX_JOBS_PER_SESSION = int(os.getenv("MAX_JOBS_PER_SESSION", 1))
+MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", 16))
+# Finished jobs are kept this long (seconds) so their session can still read them.
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", 60 * 60))
+
+ACTIVE_STATUSES = ("queued", "running")
+
+class JobLimitError(RuntimeError):
+    """Raised when a session or the whole server already runs as many jobs as allowed."""
+
+@dataclass
+class ResearchJob:
+    job_id: str
+    session_id: str
+    run_id: str
+    status: str = "queued"
+    created: float = field(default_factory=time.time)
+    started: float = None
+    finished: float = None
+    events: int = 0
+    state: dict = field(default_factory=dict)
+    # Bumped whenever a state field changes, so the UI redraws only what changed.
+    versions: dict = field(default_factory=dict)
+    # Report text as it streams in, before the final report lands in `state`.
+    live_report: str = ""
+    error: str = None
+    trace: Trace = None
+    future: object = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+    def apply(self, key: str, value):
+        self.state[key] = value
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+class JobManager:
+    """Process-wide registry of research jobs with per-session and global limits."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_JOBS, max_per_session: int = MAX_JOBS_PER_SESSION,
+                 max_queued: int = MAX_QUEUED_JOBS):
+        self.max_concurrent = max_concurrent
+        self.max_per_session = max_per_session
+        self.max_queued = max_queued
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._slots = None
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION
+        for job_id in [job_id for job_id, job in self.jobs.items() if not job.active and job.finished < cutoff]:
+            del self.jobs[job_id]
+
+    def submit(self, session_id: str, initial_state: dict, run_id: str) -> ResearchJob:
+        """Start a job for `run_id`, or return the one already running it (e.g. after a page refresh)."""
+        with self._lock:
+            self._prune()
+            active = [job for job in self.jobs.values() if job.active]
+            # Two jobs on one run id would share a checkpoint thread and run context.
+            for job in active:
+                if job.run_id == run_id:
+                    return job
+            if sum(job.session_id == session_id for job in active) >= self.max_per_session:
+                raise JobLimitError(f"This session already has {self.max_per_session} research job(s) running.")
+            if len(active) >= self.max_concurrent + self.max_queued:
+                raise JobLimitError("The server is busy; please try again in a moment.")
+            job = ResearchJob(job_id=uuid.uuid4().hex, session_id=session_id, run_id=run_id, state=dict(initial_state),
+                              trace=Trace(run_id))
+            self.jobs[job.job_id] = job
+        job.future = asyncio.run_coroutine_threadsafe(self._run(job, initial_state), get_background_loop())
+        return job
+
+    async def _run(self, job: ResearchJob, initial_state: dict):
+        # Imported here so the manager can be created without loading the graph.
+        from relearnweb_backend import astream_research
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        try:
+            async with self._slots:
+                job.status, job.started = "running", time.time()
+                async for mode, chunk in astream_research(initial_state, run_id=job.run_id, trace=job.trace,
+                                                          stream_mode=["updates", "custom"]):
+                    if mode == "custom":
+                        job.live_report = "" if chunk.get("report_reset") else job.live_report + chunk.get("report_token", "")
+                        job.versions["live_report"] = job.versions.get("live_report", 0) + 1
+                        continue
+                    job.events += 1
+                    # Update events carry only the keys each node changed.
+                    for delta in chunk.values():
+                        for key, value in (delta or {}).items():
+                            job.apply(key, value)
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as error:
+            job.status, job.error = "failed", f"{type(error).__name__}: {error}"
+        finally:
+            job.finished = time.time()
+
+    def get(self, job_id: str) -> ResearchJob:
+        return self.jobs.get(job_id)
+
+    def find(self, run_id: str) -> ResearchJob:
+        """The most recent job for `run_id`, if this process still remembers one."""
+        jobs = [job for job in list(self.jobs.values()) if job.run_id == run_id]
+        return max(jobs, key=lambda job: job.created) if jobs else None
+
+    def cancel(self, job_id: str):
+        job = self.jobs.get(job_id)
+        if job is not None and job.active and job.future is not None:
+            job.future.cancel()
+            # A queued job never starts, so its task cannot record the cancellation itself.
+            if job.status == "queued":
+                job.status, job.finished = "cancelled", time.time()
+
+    def active_jobs(self, session_id: str = None) -> list:
+        return [job for job in list(self.jobs.values())
+                if job.active and (session_id is None or job.session_id == session_id)]
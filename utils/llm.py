@@ -7,11 +7,19 @@ Date: Feb 18th 2025
 This file contains the implementation of the LLM model using langchain-openai.
 """
 
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_core.output_parsers import StrOutputParser
+import asyncio
 import os
+import re
+import threading
+import weakref
 from dotenv import load_dotenv
+from utils.aio import run_sync
+from utils.cache import DiskCache, make_key
+from utils.chunking import count_tokens
+from utils.model_profiles import ModelProfile, profile_for_node
+from utils.ratelimit import throttle
+from utils.resilience import resilient_call
+from utils.tracing import current_trace, span
 
 # Load environment variables
 load_dotenv()
@@ -22,6 +30,32 @@ REQUIRED_ENV_VARS = {
     "LLM_MODEL_ID": "LLM model identifier"
 }
 
+# Keep-alive pool shared by every client, so repeated calls reuse the same
+# TCP/TLS connections instead of handshaking again on every node.
+HTTP_POOL_LIMITS = {"max_connections": 20, "max_keepalive_connections": 10, "keepalive_expiry": 60}
+# Seconds a reset keeps the old pools open for calls still using them.
+CLIENT_CLOSE_GRACE = 300
+
+# Process-wide client registry keyed by (endpoint, API key, model, streaming,
+# max tokens, temperature) of the resolved model profile. Async
+# httpx pools are bound to the event loop that created them, so the registry
+# is kept per loop.
+_clients = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+# Opt-in memo of completions, keyed by a hash of the model, prompts and
+# sampling params. Nodes enable it with `memoize=True`.
+memo_cache = DiskCache(
+    "llm_memo",
+    ttl=float(os.getenv("LLM_MEMO_TTL", 7 * 24 * 60 * 60)),
+    max_entries=int(os.getenv("LLM_MEMO_MAX_ENTRIES", 5000)),
+)
+
+# The system prompt carries an "Effective [YYYY-MM-DD]" stamp. It is masked in
+# the memo key so entries survive midnight; staleness is bounded by LLM_MEMO_TTL.
+# Dates inside the user prompt are real input and stay part of the key.
+DATE_STAMP = re.compile(r"\d{4}-\d{2}-\d{2}")
+
 def validate_environment():
     missing_vars = [var for var, description in REQUIRED_ENV_VARS.items() 
                    if not os.getenv(var)]
@@ -29,24 +63,120 @@ def validate_environment():
         raise EnvironmentError(
             f"Missing required environment variables: {', '.join(missing_vars)}")
 
-def generate_llm_response(system_prompt: str, user_prompt: str, 
-                         streaming: bool = True, verbose: bool = False) -> str:
-    validate_environment()
-    
+def get_llm_client(streaming: bool = True, verbose: bool = False, profile: ModelProfile = None):
+    """Return the shared `ChatOpenAI | StrOutputParser` chain for a model profile and the current event loop."""
+    profile = profile or profile_for_node()
+    loop = asyncio.get_running_loop()
+    key = (profile.endpoint, profile.api_key, profile.model, streaming, profile.max_tokens, profile.temperature)
+    client = _clients.get(loop, {}).get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        # Another thread may have built it while we waited for the lock.
+        loop_clients = _clients.setdefault(loop, {})
+        client = loop_clients.get(key)
+        if client is None:
+            validate_environment()
+            # langchain and httpx are imported on first use, so importing this module stays cheap.
+            import httpx
+            from langchain_core.output_parsers import StrOutputParser
+            from langchain_openai import ChatOpenAI
+            # Only pass sampling settings the profile sets, so server defaults still apply otherwise.
+            sampling = {}
+            if profile.max_tokens is not None:
+                sampling["max_tokens"] = profile.max_tokens
+            if profile.temperature is not None:
+                sampling["temperature"] = profile.temperature
+            client = ChatOpenAI(
+                model=profile.model,
+                base_url=profile.endpoint,
+                api_key=profile.api_key,
+                streaming=streaming,
+                verbose=verbose,
+                # Retries, backoff and timeouts are handled by utils/resilience.py.
+                max_retries=0,
+                http_async_client=httpx.AsyncClient(limits=httpx.Limits(**HTTP_POOL_LIMITS)),
+                **sampling,
+            ) | StrOutputParser()
+            loop_clients[key] = client
+    return client
+
+async def close_http_clients(clients: list, delay: float = 0):
+    # Calls that already hold a dropped client get `delay` seconds to finish first.
+    await asyncio.sleep(delay)
+    for http_client in clients:
+        await http_client.aclose()
+
+def reset_llm_clients():
+    """Drop every cached client, e.g. after the settings in `.env` were rewritten.
+
+    Each dropped client's connection pool is closed on the loop that owns it.
+    """
+    with _clients_lock:
+        dropped = [(loop, list(loop_clients.values())) for loop, loop_clients in _clients.items()]
+        _clients.clear()
+    for loop, clients in dropped:
+        http_clients = [client.first.http_async_client for client in clients]
+        if loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(close_http_clients(http_clients, CLIENT_CLOSE_GRACE), loop)
+
+def memo_key(llm, system_prompt: str, user_prompt: str) -> str:
+    chat_model = llm.first
+    sampling = {"temperature": chat_model.temperature, "max_tokens": chat_model.max_tokens}
+    # The endpoint is part of the key: two servers may serve different models under one name.
+    return make_key(chat_model.openai_api_base, chat_model.model_name, DATE_STAMP.sub("<date>", system_prompt),
+                    user_prompt, sampling)
+
+async def agenerate_llm_response(system_prompt: str, user_prompt: str,
+                                 streaming: bool = True, verbose: bool = False,
+                                 memoize: bool = False, node: str = None, on_token=None) -> str:
+    # `on_token(chunk)` receives the completion as it streams; `on_token(None)`
+    # marks the start of each attempt, so a retried stream can start over.
+    from langchain_core.messages import HumanMessage, SystemMessage
     messages = [
         SystemMessage(content=system_prompt),
         HumanMessage(content=user_prompt),
     ]
-    
-    llm = ChatOpenAI(
-        model=os.getenv("LLM_MODEL_ID"),
-        base_url=os.getenv("LLM_ENDPOINT"),
-        api_key=os.getenv("LLM_API_KEY"),
-        streaming=streaming,
-        verbose=verbose
-    ) | StrOutputParser()
-    
-    return llm.invoke(messages)
+
+    # `node` picks the model profile; see utils/model_profiles.py.
+    llm = get_llm_client(streaming=streaming, verbose=verbose, profile=profile_for_node(node))
+
+    with span("generate_llm_response", "llm", model=llm.first.model_name, node=node) as trace_args:
+        if memoize:
+            key = memo_key(llm, system_prompt, user_prompt)
+            hit, response = memo_cache.get(key)
+            trace_args["memo_hit"] = hit
+            if hit:
+                return response
+
+        async def request():
+            await throttle("llm")
+            if on_token is None:
+                return await llm.ainvoke(messages)
+            on_token(None)
+            chunks = []
+            async for chunk in llm.astream(messages):
+                chunks.append(chunk)
+                on_token(chunk)
+            return "".join(chunks)
+
+        # Hedging would interleave two token streams, so streamed calls are not hedged.
+        response = await resilient_call("llm", request, hedge=on_token is None)
+
+        if memoize:
+            memo_cache.set(key, response)
+
+        if current_trace() is not None:
+            trace_args["prompt_tokens"] = count_tokens(system_prompt) + count_tokens(user_prompt)
+            trace_args["completion_tokens"] = count_tokens(response)
+
+    return response
+
+def generate_llm_response(system_prompt: str, user_prompt: str, 
+                         streaming: bool = True, verbose: bool = False,
+                         memoize: bool = False, node: str = None) -> str:
+    return run_sync(agenerate_llm_response(system_prompt, user_prompt, streaming=streaming, verbose=verbose, memoize=memoize, node=node))
 
 if __name__ == "__main__":
     response = generate_llm_response(
@@ -54,4 +184,4 @@ if __name__ == "__main__":
         user_prompt="Hello, how are you?",
         verbose=True
     )
-    print(response)
\ No newline at end of file
+    print(response)
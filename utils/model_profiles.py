@@ -0,0 +1,75 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the per-node model routing. Each graph node resolves to a
+model profile (endpoint, model, max tokens, temperature), so short structured
+steps can run on a small fast model while synthesis stays on the large one.
+"""
+
+from dataclasses import dataclass
+import os
+
+# Environment prefix of every profile. The "fast" profile falls back to the
+# default one field by field, so leaving it empty keeps a single model; the API
+# key only falls back together with the endpoint.
+PROFILE_ENV_PREFIXES = {
+    "default": "LLM_",
+    "fast": "FAST_LLM_",
+}
+
+# Nodes that only emit short structured output start on the fast profile.
+# Override any node with <NODE>_LLM_PROFILE, e.g. MARKDOWN_REPORT_LLM_PROFILE=fast.
+ROUTED_NODES = ("learner_node", "serp_queries", "summarize_page", "process_results", "compile_results", "markdown_report")
+DEFAULT_NODE_PROFILES = {
+    "serp_queries": "fast",
+    "compile_results": "fast",
+}
+
+@dataclass(frozen=True)
+class ModelProfile:
+    name: str
+    endpoint: str
+    api_key: str
+    model: str
+    max_tokens: int = None
+    temperature: float = None
+
+def node_profile_env(node: str) -> str:
+    return f"{node.upper()}_LLM_PROFILE"
+
+def get_profile(name: str = "default") -> ModelProfile:
+    if name not in PROFILE_ENV_PREFIXES:
+        raise ValueError(f"Unknown model profile '{name}', expected one of {', '.join(PROFILE_ENV_PREFIXES)}")
+
+    def setting(field: str) -> str:
+        value = os.getenv(f"{PROFILE_ENV_PREFIXES[name]}{field}")
+        return value if value else os.getenv(f"{PROFILE_ENV_PREFIXES['default']}{field}")
+
+    prefix = PROFILE_ENV_PREFIXES[name]
+    api_key = setting("API_KEY")
+    # A profile pointing at its own endpoint must bring its own key, so the default
+    # profile's credentials are never sent to another provider.
+    if name != "default" and os.getenv(f"{prefix}ENDPOINT") and not os.getenv(f"{prefix}API_KEY"):
+        raise EnvironmentError(
+            f"Model profile '{name}' sets {prefix}ENDPOINT but not {prefix}API_KEY; "
+            f"set {prefix}API_KEY, or unset {prefix}ENDPOINT to use the default endpoint")
+
+    max_tokens = setting("MAX_TOKENS")
+    temperature = setting("TEMPERATURE")
+    return ModelProfile(
+        name=name,
+        endpoint=setting("ENDPOINT"),
+        api_key=api_key,
+        model=setting("MODEL_ID"),
+        max_tokens=int(max_tokens) if max_tokens else None,
+        temperature=float(temperature) if temperature else None,
+    )
+
+def profile_for_node(node: str = None) -> ModelProfile:
+    """Resolve the model profile a graph node should call."""
+    if node is None:
+        return get_profile("default")
+    return get_profile(os.getenv(node_profile_env(node)) or DEFAULT_NODE_PROFILES.get(node, "default"))
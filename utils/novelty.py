@@ -0,0 +1,38 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the novelty measure used for adaptive depth: the share of
+an iteration's word n-grams that no earlier iteration of the run produced.
+"""
+
+import re
+import threading
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def shingles(text: str, size: int = 3) -> set:
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+class NoveltyTracker:
+    """Remembers every n-gram seen in a run and scores how new the next text is."""
+
+    def __init__(self, shingle_size: int = 3):
+        self.shingle_size = shingle_size
+        self.seen = set()
+        self._lock = threading.Lock()
+
+    def update(self, text: str) -> float:
+        """Return the fraction of `text`'s n-grams not seen before (1.0 for the first text), then remember them."""
+        current = shingles(text, self.shingle_size)
+        with self._lock:
+            if not current:
+                return 0.0
+            novelty = 1.0 if not self.seen else len(current - self.seen) / len(current)
+            self.seen |= current
+        return novelty
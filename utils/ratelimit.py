@@ -0,0 +1,63 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the process-wide rate limits applied to LLM and Firecrawl
+requests, shared by every research run in the process.
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per second with bursts of up to `burst`.
+
+    A thread lock guards the bucket, so one limiter works across threads and event loops.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _try_acquire(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            wait = self._try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+_limiters = {}
+
+def set_rate_limit(name: str, rate: float = None, burst: int = 1):
+    """Limit `name` ("llm", "firecrawl") to `rate` requests per second; None removes the limit."""
+    if rate:
+        _limiters[name] = RateLimiter(rate, burst)
+    else:
+        _limiters.pop(name, None)
+
+async def throttle(name: str):
+    limiter = _limiters.get(name)
+    if limiter is not None:
+        await limiter.acquire()
+
+# Optional defaults from the environment, in requests per second.
+for _name, _env in (("llm", "LLM_RATE_LIMIT"), ("firecrawl", "FIRECRAWL_RATE_LIMIT")):
+    if os.getenv(_env):
+        set_rate_limit(_name, float(os.getenv(_env)))
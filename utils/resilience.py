@@ -0,0 +1,245 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the resilience layer shared by the LLM and Firecrawl calls:
+jittered exponential retries, run deadlines, optional hedged requests and a
+circuit breaker per backend.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from utils.tracing import count
+
+class CircuitOpenError(RuntimeError):
+    """The backend failed repeatedly and is being skipped until its cool-down ends."""
+
+class DeadlineExceeded(TimeoutError):
+    """The run's deadline passed before the call could finish."""
+
+_deadline = contextvars.ContextVar("relearnweb_deadline", default=None)
+
+@contextmanager
+def deadline(seconds: float = None):
+    """Bound every resilient call made in this context (and its tasks) to `seconds` from now."""
+    if seconds is None:
+        yield
+        return
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining_time() -> float:
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+@dataclass
+class RetryPolicy:
+    attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    attempt_timeout: float = None   # per-attempt cap in seconds, on top of the run deadline
+
+    def backoff(self, attempt: int) -> float:
+        # "Full jitter": uniform in [0, min(max_delay, base * 2^attempt)].
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures, then lets one probe through after `reset_timeout`."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def before_call(self, name: str) -> bool:
+        """Raise if the circuit is open; return True if this call is the half-open probe."""
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half_open" and self.probing):
+                raise CircuitOpenError(f"{name} circuit is open after {self.failures} consecutive failures")
+            if state == "half_open":
+                self.probing = True
+                return True
+            return False
+
+    def release_probe(self):
+        # A probe that ended without a verdict (cancelled, deadline, client error)
+        # frees the slot so the next call can probe again.
+        with self._lock:
+            self.probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probing = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+class Backend:
+    """Retry policy, circuit breaker and latency window for one external service."""
+
+    def __init__(self, name: str, retry: RetryPolicy, breaker: CircuitBreaker,
+                 hedging: bool = False, hedge_min_samples: int = 20):
+        self.name = name
+        self.retry = retry
+        self.breaker = breaker
+        self.hedging = hedging
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = deque(maxlen=200)
+
+    def hedge_delay(self) -> float:
+        """p95 of recent successful latencies, or None while hedging is off or warming up."""
+        if not self.hedging or len(self.latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    async def timed(self, factory):
+        started = time.monotonic()
+        result = await factory()
+        self.latencies.append(time.monotonic() - started)
+        return result
+
+    async def hedged(self, factory):
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self.timed(factory)
+
+        primary = asyncio.ensure_future(self.timed(factory))
+        pending = {primary}
+        # Everything after ensure_future sits in the try, so a caller cancelled or
+        # timed out at any point also cancels the requests it started.
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            # The primary is slower than p95: race a duplicate and keep whichever succeeds first.
+            count(f"{self.name}.hedges")
+            pending = {primary, asyncio.ensure_future(self.timed(factory))}
+            first_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in pending | {primary}:
+                if not task.done():
+                    task.cancel()
+
+    async def attempt(self, factory, hedge: bool = True):
+        call = self.hedged if hedge else self.timed
+        timeout = self.retry.attempt_timeout
+        remaining = remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                raise DeadlineExceeded(f"run deadline passed before calling {self.name}")
+            if timeout is None or remaining < timeout:
+                try:
+                    return await asyncio.wait_for(call(factory), remaining)
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded(f"run deadline passed while calling {self.name}") from None
+        if timeout is None:
+            return await call(factory)
+        return await asyncio.wait_for(call(factory), timeout)
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (CircuitOpenError, DeadlineExceeded, ValueError, TypeError, KeyError)):
+        return False
+    # Client errors will not fix themselves, except timeouts and rate limits.
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500 and status not in (408, 409, 429):
+        return False
+    return True
+
+def env_flag(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+def env_float(name: str, default: float = None) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+_backends = {
+    "llm": Backend(
+        "llm",
+        RetryPolicy(attempts=int(os.getenv("LLM_MAX_ATTEMPTS", 3)), attempt_timeout=env_float("LLM_ATTEMPT_TIMEOUT")),
+        CircuitBreaker(int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5)), env_float("CIRCUIT_RESET_SECONDS", 30.0)),
+        hedging=env_flag("LLM_HEDGING"),
+    ),
+    "firecrawl": Backend(
+        "firecrawl",
+        RetryPolicy(attempts=int(os.getenv("FIRECRAWL_MAX_ATTEMPTS", 3)), attempt_timeout=env_float("FIRECRAWL_ATTEMPT_TIMEOUT", 30.0)),
+        CircuitBreaker(int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5)), env_float("CIRCUIT_RESET_SECONDS", 30.0)),
+        hedging=env_flag("FIRECRAWL_HEDGING"),
+    ),
+}
+
+def get_backend(name: str) -> Backend:
+    return _backends[name]
+
+async def resilient_call(name: str, factory, hedge: bool = True):
+    """Await `factory()` with the retries, deadline, hedging and circuit breaker of backend `name`.
+
+    `factory` must return a fresh coroutine on every call, since retries and hedges re-issue it.
+    Pass `hedge=False` for calls with side effects that must not run twice at once.
+    """
+    backend = get_backend(name)
+    for attempt in range(1, backend.retry.attempts + 1):
+        try:
+            probe = backend.breaker.before_call(name)
+        except CircuitOpenError:
+            count(f"{name}.circuit_open")
+            raise
+        try:
+            result = await backend.attempt(factory, hedge=hedge)
+        except Exception as error:
+            retryable = is_retryable(error)
+            # Only backend-side failures count towards opening the circuit.
+            if retryable:
+                backend.breaker.record_failure()
+            if not retryable or attempt == backend.retry.attempts:
+                raise
+            delay = backend.retry.backoff(attempt)
+            remaining = remaining_time()
+            if remaining is not None and delay >= remaining:
+                raise
+            count(f"{name}.retries")
+            await asyncio.sleep(delay)
+        else:
+            backend.breaker.record_success()
+            return result
+        finally:
+            if probe:
+                backend.breaker.release_probe()
@@ -0,0 +1,35 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the per-run scratch space that lives outside the graph
+state, so heavyweight objects persist across depth iterations of one run.
+"""
+
+from dataclasses import dataclass, field
+import threading
+from utils.dedup import ContentDeduper
+from utils.embeddings import EmbeddingIndex
+from utils.novelty import NoveltyTracker
+
+@dataclass
+class RunContext:
+    run_id: str
+    index: EmbeddingIndex = field(default_factory=EmbeddingIndex)
+    deduper: ContentDeduper = field(default_factory=ContentDeduper)
+    novelty: NoveltyTracker = field(default_factory=NoveltyTracker)
+
+_contexts = {}
+_contexts_lock = threading.Lock()
+
+def get_run_context(run_id: str) -> RunContext:
+    with _contexts_lock:
+        if run_id not in _contexts:
+            _contexts[run_id] = RunContext(run_id=run_id)
+        return _contexts[run_id]
+
+def release_run_context(run_id: str):
+    with _contexts_lock:
+        _contexts.pop(run_id, None)
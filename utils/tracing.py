@@ -0,0 +1,177 @@
+"""
+Quadropic OSS
+https://oss.quadropic.com
+Author: Quadropic OSS Contributors
+Date: Oct 17th 2026
+
+This file contains the lightweight run tracing: spans around graph nodes and
+external calls, exported as a Chrome trace plus an aggregated summary.
+"""
+
+from contextlib import contextmanager
+from collections import defaultdict
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+TRACE_DIR = os.getenv("TRACE_DIR", os.path.join(os.getenv("RELEARNWEB_CACHE_DIR", ".cache"), "traces"))
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "1").lower() not in ("0", "false", "no")
+# Only the newest TRACE_MAX_RUNS runs keep their trace files in TRACE_DIR.
+TRACE_MAX_RUNS = int(os.getenv("TRACE_MAX_RUNS", 200))
+
+_current_trace = contextvars.ContextVar("relearnweb_trace", default=None)
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+class Trace:
+    """Spans and counters for one research run. Recording is a tuple append."""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.origin_ns = time.perf_counter_ns()
+        self.started_at = time.time()
+        self.spans = []
+        self.counters = defaultdict(int)
+
+    def record(self, name: str, category: str, start_ns: int, end_ns: int, args: dict):
+        try:
+            lane = id(asyncio.current_task())
+        except RuntimeError:
+            lane = threading.get_ident()
+        self.spans.append((name, category, start_ns, end_ns, lane, args))
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] += value
+
+    def to_chrome(self) -> dict:
+        pid = os.getpid()
+        events = [{
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start_ns - self.origin_ns) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": pid,
+            "tid": lane,
+            "args": args,
+        } for name, category, start_ns, end_ns, lane, args in self.spans]
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"run_id": self.run_id}}
+
+    def summary(self) -> dict:
+        durations = defaultdict(list)
+        totals = defaultdict(lambda: defaultdict(int))
+        for name, category, start_ns, end_ns, _, args in self.spans:
+            key = f"{category}:{name}"
+            durations[key].append((end_ns - start_ns) / 1e6)
+            for field, value in args.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    totals[key][field] += value
+                elif value is True:
+                    totals[key][field] += 1
+        spans = {}
+        for key, values in sorted(durations.items()):
+            spans[key] = {
+                "count": len(values),
+                "total_ms": round(sum(values), 3),
+                "p50_ms": round(percentile(values, 0.5), 3),
+                "p95_ms": round(percentile(values, 0.95), 3),
+                "max_ms": round(max(values), 3),
+                **totals[key],
+            }
+        last_end_ns = max((end_ns for _, _, _, end_ns, _, _ in self.spans), default=self.origin_ns)
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "wall_ms": round((last_end_ns - self.origin_ns) / 1e6, 3),
+            "spans": spans,
+            "counters": dict(self.counters),
+        }
+
+    def export(self, directory: str = TRACE_DIR) -> str:
+        """Write `<run_id>.trace.json` (Chrome trace) and `<run_id>.summary.json`; return the trace path."""
+        os.makedirs(directory, exist_ok=True)
+        trace_path = os.path.join(directory, f"{self.run_id}.trace.json")
+        with open(trace_path, "w", encoding="utf-8") as trace_file:
+            json.dump(self.to_chrome(), trace_file, default=str)
+        with open(os.path.join(directory, f"{self.run_id}.summary.json"), "w", encoding="utf-8") as summary_file:
+            json.dump(self.summary(), summary_file, indent=2)
+        prune_traces(directory)
+        return trace_path
+
+def prune_traces(directory: str = TRACE_DIR, max_runs: int = TRACE_MAX_RUNS):
+    """Delete the trace and summary files of all but the newest `max_runs` runs."""
+    traces = []
+    for name in os.listdir(directory):
+        if name.endswith(".trace.json"):
+            path = os.path.join(directory, name)
+            try:
+                traces.append((os.path.getmtime(path), name[:-len(".trace.json")]))
+            except FileNotFoundError:
+                continue
+    traces.sort(reverse=True)
+    for _, run_id in traces[max_runs:]:
+        for suffix in (".trace.json", ".summary.json"):
+            try:
+                os.remove(os.path.join(directory, run_id + suffix))
+            except FileNotFoundError:
+                pass
+
+def current_trace():
+    return _current_trace.get()
+
+@contextmanager
+def start_trace(trace: Trace):
+    """Make `trace` the active trace for this context and every task started from it.
+
+    Enter and exit it in the same task, never across an async generator's `yield`.
+    """
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+@contextmanager
+def span(name: str, category: str = "function", **args):
+    """Time a block; callers may add numeric fields to the yielded args dict."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield args
+        return
+    start_ns = time.perf_counter_ns()
+    try:
+        yield args
+    except BaseException as error:
+        args["error"] = type(error).__name__
+        raise
+    finally:
+        trace.record(name, category, start_ns, time.perf_counter_ns(), args)
+
+def count(name: str, value: int = 1):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.count(name, value)
+
+def traced_node(name: str, node):
+    """Wrap a graph node (sync or async) in a "node" span."""
+    if inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def async_wrapper(*args, **kwargs):
+            with span(name, "node"):
+                return await node(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(node)
+    def wrapper(*args, **kwargs):
+        with span(name, "node"):
+            return node(*args, **kwargs)
+    return wrapper